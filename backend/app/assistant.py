@@ -0,0 +1,110 @@
+import os
+import threading
+
+from app.brain.ai_engine import process_input_detailed
+
+STOP_WORDS = {"stop"}
+EXIT_WORDS = {"quit", "exit", "bye", "close"}
+STREAM_RESPONSES = os.getenv("ASSISTANT_STREAM_RESPONSES", "1") != "0"
+STOPPED_RESPONSE = "Okay, I stopped. Say hey jarvis when you need me again."
+
+
+class TextAssistant:
+    """Text-only assistant: handles `text_input` from clients without any audio stack.
+
+    `VoiceAssistant` extends it with microphone/TTS handling; this base class never
+    imports `sounddevice`, `faster_whisper` or `pyttsx3`.
+    """
+
+    voice_enabled = False
+
+    def __init__(self, on_event=None):
+        self.on_event = on_event
+        self.running = False
+        self.session_awake = False
+        # Cancellation tokens of the turns in flight; `stop` sets them all.
+        self._active_turns: set[threading.Event] = set()
+        self._turns_lock = threading.Lock()
+
+    def _emit(self, event_type, data):
+        if self.on_event:
+            self.on_event(event_type, data)
+
+    def start(self):
+        if self.running:
+            return
+        self.running = True
+        self._emit("status", "connected")
+
+    def stop(self):
+        self.running = False
+        self._stop_output()
+
+    def _stop_output(self):
+        """Cancel in-flight turns (queued or generating LLM requests); voice also stops speech."""
+        with self._turns_lock:
+            active = list(self._active_turns)
+        for cancel_event in active:
+            cancel_event.set()
+
+    def _is_stop_command(self, text: str) -> bool:
+        words = set(text.lower().split())
+        return any(word in words for word in STOP_WORDS)
+
+    def _is_exit_command(self, text: str) -> bool:
+        words = set(text.lower().split())
+        return any(word in words for word in EXIT_WORDS)
+
+    def _run_turn(self, text: str, on_delta=None, cancel_event: threading.Event | None = None):
+        """Process one turn and emit route/tool/final response events."""
+        cancel_event = cancel_event or threading.Event()
+        with self._turns_lock:
+            self._active_turns.add(cancel_event)
+        try:
+            turn = process_input_detailed(text, on_delta=on_delta, cancel_event=cancel_event)
+        finally:
+            with self._turns_lock:
+                self._active_turns.discard(cancel_event)
+        route = {"route": turn.route}
+        if turn.prompt_tokens:
+            route["prompt_tokens"] = turn.prompt_tokens
+        self._emit("agent_route", route)
+        if turn.tool_name:
+            self._emit("tool_call", {"name": turn.tool_name, "args": turn.tool_args or {}})
+        self._emit("ai_response", turn.response)
+        return turn
+
+    def _respond(self, text: str):
+        self._emit("status", "processing")
+        on_delta = None
+        if STREAM_RESPONSES:
+            on_delta = lambda token: self._emit("ai_response_delta", token)
+        self._run_turn(text, on_delta=on_delta)
+
+    def handle_text_input(self, text: str):
+        if not text:
+            return
+
+        def _process():
+            lowered = text.lower().strip()
+            self._emit("user_speech", text)
+
+            if self._is_stop_command(lowered):
+                self._stop_output()
+                self.session_awake = False
+                self._emit("ai_response", STOPPED_RESPONSE)
+                return
+
+            if self._is_exit_command(lowered):
+                self._stop_output()
+                self._emit("ai_response", "Goodbye.")
+                self.running = False
+                return
+
+            self._respond(text)
+            self._emit("status", "listening")
+
+        threading.Thread(target=_process, daemon=True).start()
+
+
+assistant = TextAssistant()
@@ -1,25 +1,39 @@
 from app.brain.commands import handle_command
-from app.brain.llm_engine import ask_llm
-from app.brain.memory import ShortTermMemory, get_relevant_memory
+from app.brain.conversation import ConversationMemory
+from app.brain.llm_engine import BuiltPrompt, ask_prompt, build_prompt, stream_prompt
+from app.brain.memory import get_relevant_memory
+from app.brain.response_cache import get_response_cache
+from collections.abc import Callable
 from dataclasses import dataclass
+import threading
 
-_short_memory = ShortTermMemory(max_messages=20)
+_short_memory = ConversationMemory()
+# Prompts of turns still generating, keyed on (question, memory context). A duplicate
+# send reuses the prompt so llm_engine coalesces it onto the same generation.
+_turns_in_flight: dict[tuple[str, str], BuiltPrompt] = {}
+_turns_lock = threading.Lock()
 EXIT_WORDS = {"stop", "quit", "exit", "bye", "close"}
 
 
 @dataclass
 class AgentTurn:
     response: str
-    route: str  # rule | tool | llm
+    route: str  # rule | tool | llm | cache
     tool_name: str | None = None
     tool_args: dict | None = None
+    prompt_tokens: dict | None = None  # per-section prompt token counts (llm route only)
 
 
 def process_input(user_text: str) -> str:
     return process_input_detailed(user_text).response
 
 
-def process_input_detailed(user_text: str) -> AgentTurn:
+def process_input_detailed(
+    user_text: str,
+    on_delta: Callable[[str], None] | None = None,
+    cancel_event: threading.Event | None = None,
+) -> AgentTurn:
+    """Route one user turn. With `on_delta`, LLM answers are streamed token by token."""
     cleaned = (user_text or "").strip()
     if not cleaned:
         return AgentTurn(response="I did not hear anything.", route="rule")
@@ -47,12 +61,55 @@ def process_input_detailed(user_text: str) -> AgentTurn:
             tool_args=command.tool_args,
         )
 
-    _short_memory.add("user", cleaned)
     memory_context = get_relevant_memory(cleaned)
-    response = ask_llm(
-        user_text=cleaned,
-        conversation_history=_short_memory.as_list(),
-        memory_context=memory_context,
-    )
-    _short_memory.add("assistant", response)
-    return AgentTurn(response=response, route="llm")
+    turn_key = (lowered, memory_context)
+    with _turns_lock:
+        built = _turns_in_flight.get(turn_key)
+        duplicate = built is not None
+        if not duplicate:
+            history = _short_memory.as_list()
+            _short_memory.add("user", cleaned)
+            built = build_prompt(
+                user_text=cleaned,
+                conversation_history=history,
+                memory_context=memory_context,
+                conversation_summary=_short_memory.summary,
+            )
+            _turns_in_flight[turn_key] = built
+    if duplicate:
+        # Same question while the first is still answering: share its generation and
+        # leave the history to the first turn.
+        response = _generate(built, on_delta, cancel_event)
+        return AgentTurn(response=response, route="llm", prompt_tokens=dict(built.tokens))
+
+    try:
+        cache = get_response_cache()
+        cached = cache.lookup(cleaned, memory_context, history) if cache is not None else None
+        if cached is not None:
+            if on_delta is not None:
+                on_delta(cached)
+            _short_memory.add("assistant", cached)
+            return AgentTurn(response=cached, route="cache")
+
+        response = _generate(built, on_delta, cancel_event)
+        if cache is not None and not (cancel_event is not None and cancel_event.is_set()):
+            cache.store(cleaned, memory_context, response, history)
+        _short_memory.add("assistant", response)
+    finally:
+        with _turns_lock:
+            _turns_in_flight.pop(turn_key, None)
+    return AgentTurn(response=response, route="llm", prompt_tokens=dict(built.tokens))
+
+
+def _generate(
+    built: BuiltPrompt,
+    on_delta: Callable[[str], None] | None,
+    cancel_event: threading.Event | None,
+) -> str:
+    if on_delta is None:
+        return ask_prompt(built, cancel_event=cancel_event)
+    parts = []
+    for token in stream_prompt(built, cancel_event=cancel_event):
+        parts.append(token)
+        on_delta(token)
+    return "".join(parts).strip()
@@ -0,0 +1,46 @@
+import asyncio
+import functools
+from concurrent.futures import ThreadPoolExecutor
+
+from app.brain import memory
+
+# Coroutine versions of the app.brain.memory API for code running on the event loop.
+# Writes go to a single writer thread (they serialize on the writer connection anyway);
+# reads go to a pool sized like the reader connection pool, so lookups never queue
+# behind writes.
+_writer_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="memory-writer")
+_reader_executor = ThreadPoolExecutor(
+    max_workers=max(1, memory.MEMORY_READERS), thread_name_prefix="memory-reader"
+)
+
+
+def _run_on(executor: ThreadPoolExecutor, fn):
+    @functools.wraps(fn)
+    async def wrapper(*args, **kwargs):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(executor, functools.partial(fn, *args, **kwargs))
+
+    return wrapper
+
+
+upsert_profile = _run_on(_writer_executor, memory.upsert_profile)
+add_note = _run_on(_writer_executor, memory.add_note)
+add_notes = _run_on(_writer_executor, memory.add_notes)
+add_task = _run_on(_writer_executor, memory.add_task)
+add_tasks = _run_on(_writer_executor, memory.add_tasks)
+complete_task = _run_on(_writer_executor, memory.complete_task)
+import_records = _run_on(_writer_executor, memory.import_records)
+cleanup_memory = _run_on(_writer_executor, memory.cleanup_memory)
+
+get_profile = _run_on(_reader_executor, memory.get_profile)
+search_notes = _run_on(_reader_executor, memory.search_notes)
+semantic_search_notes = _run_on(_reader_executor, memory.semantic_search_notes)
+list_tasks = _run_on(_reader_executor, memory.list_tasks)
+get_memory_stats = _run_on(_reader_executor, memory.get_memory_stats)
+get_relevant_memory = _run_on(_reader_executor, memory.get_relevant_memory)
+backup_memory = _run_on(_reader_executor, memory.backup_memory)
+
+
+def shutdown(wait: bool = True) -> None:
+    _writer_executor.shutdown(wait=wait)
+    _reader_executor.shutdown(wait=wait)
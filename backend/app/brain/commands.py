@@ -6,6 +6,7 @@ import shutil
 import os
 from pathlib import Path
 import socket
+import sqlite3
 import time
 import shlex
 from urllib.parse import quote_plus
@@ -13,6 +14,7 @@ from urllib.parse import quote_plus
 from app.brain.memory import (
     add_note,
     add_task,
+    backup_memory,
     cleanup_memory,
     complete_task,
     get_memory_stats,
@@ -21,6 +23,7 @@ from app.brain.memory import (
     search_notes,
     upsert_profile,
 )
+from app.brain.response_cache import get_response_cache_stats
 
 
 @dataclass
@@ -38,6 +41,17 @@ def _format_tasks(tasks: list[dict]) -> str:
     return "Pending tasks:\n" + "\n".join(lines)
 
 
+def _format_response_cache_stats() -> str:
+    stats = get_response_cache_stats()
+    if not stats["enabled"]:
+        return ""
+    return (
+        f"\nLLM response cache: {stats['hit_rate']:.0%} hit rate "
+        f"({stats['hits']} hits, {stats['misses']} misses, {stats['bypassed']} bypassed, "
+        f"{stats['entries']} entries)"
+    )
+
+
 def _run_git_today_commits() -> str:
     try:
         result = subprocess.run(
@@ -485,10 +499,18 @@ def handle_command(user_text: str) -> CommandResult:
             True,
             (
                 f"DB: {stats['db_path']}\n"
+                f"Size: {stats['db_size_bytes'] / 1_048_576:.1f} MB "
+                f"(WAL: {stats['wal_size_bytes'] / 1_048_576:.1f} MB, "
+                f"free pages: {stats['freelist_count']} of {stats['page_count']})\n"
                 f"Notes: {stats['notes_count']} / {stats['max_notes']}\n"
                 f"Tasks: {stats['tasks_count']} / {stats['max_tasks']}\n"
                 f"Done tasks: {stats['done_tasks_count']} "
-                f"(retention: {stats['done_task_retention_days']} days)"
+                f"(retention: {stats['done_task_retention_days']} days)\n"
+                f"Profile cache: {stats['profile_cache']['hits']} hits / "
+                f"{stats['profile_cache']['misses']} misses\n"
+                f"Pending tasks cache: {stats['pending_tasks_cache']['hits']} hits / "
+                f"{stats['pending_tasks_cache']['misses']} misses"
+                f"{_format_response_cache_stats()}"
             ),
         )
 
@@ -496,6 +518,13 @@ def handle_command(user_text: str) -> CommandResult:
         cleanup_memory()
         return CommandResult(True, "Memory cleanup completed.")
 
+    if "backup memory" in normalized:
+        try:
+            path = backup_memory()
+        except (OSError, sqlite3.Error) as e:
+            return CommandResult(True, f"Memory backup failed: {e}")
+        return CommandResult(True, f"Memory backed up to {path}.")
+
     # Prevent command-like voice inputs from falling into long LLM responses.
     command_like = any(
         token in normalized
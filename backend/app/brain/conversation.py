@@ -0,0 +1,113 @@
+import os
+import threading
+
+from app.brain.llm_engine import summarize_conversation
+from app.brain.memory import ShortTermMemory, get_conversation_summary, save_conversation_summary
+from app.brain.tokens import count_tokens
+
+# Prompt budget for the running summary plus the verbatim recent turns.
+HISTORY_TOKEN_BUDGET = int(os.getenv("ASSISTANT_HISTORY_TOKEN_BUDGET", "1200"))
+SUMMARY_TOKEN_BUDGET = int(os.getenv("ASSISTANT_SUMMARY_TOKEN_BUDGET", "250"))
+MIN_RECENT_MESSAGES = int(os.getenv("ASSISTANT_MIN_RECENT_MESSAGES", "4"))
+SUMMARIZE_HISTORY = os.getenv("ASSISTANT_SUMMARIZE_HISTORY", "1") != "0"
+# Once over budget, evict down to this fraction of it, so the summary (and with it the
+# prompt prefix the model can reuse from its KV cache) changes every few turns, not every turn.
+EVICTION_LOW_WATER = 0.7
+# Evicted turns waiting for a summary are capped so an unreachable model cannot grow them forever.
+MAX_PENDING_MESSAGES = 40
+
+
+class ConversationMemory(ShortTermMemory):
+    """Recent turns verbatim plus a rolling summary of older ones, within a token budget.
+
+    At the end of each turn the oldest messages beyond the budget are evicted. A
+    background thread folds them into the summary with the LLM between turns and
+    persists it, so the prompt stays bounded and restarts keep the gist. Evicted turns
+    stay in `as_list` until a summary covering them is stored, so nothing falls out of
+    both while the summary is pending or its request was preempted.
+    """
+
+    def __init__(
+        self,
+        token_budget: int = HISTORY_TOKEN_BUDGET,
+        summary_budget: int = SUMMARY_TOKEN_BUDGET,
+        min_recent: int = MIN_RECENT_MESSAGES,
+        summarize: bool = SUMMARIZE_HISTORY,
+    ):
+        super().__init__(max_messages=None)
+        self.token_budget = token_budget
+        self.summary_budget = summary_budget
+        self.min_recent = max(2, min_recent)
+        self.summarize = summarize
+        self._summary = get_conversation_summary() if summarize else ""
+        self._pending: list[dict] = []
+        self._kick = False
+        self._wake = threading.Condition(self._lock)
+        self._worker: threading.Thread | None = None
+        self.summaries_made = 0
+
+    @property
+    def summary(self) -> str:
+        with self._lock:
+            return self._summary
+
+    def add(self, role: str, content: str) -> None:
+        with self._lock:
+            super().add(role, content)
+            if role == "assistant":
+                # Evict only between turns, so the turn in flight keeps the context it started with.
+                self._evict_locked()
+                if self._pending:
+                    self._kick_summarizer_locked()
+
+    def as_list(self) -> list[dict]:
+        with self._lock:
+            return self._pending + list(self._messages)
+
+    def history_tokens(self) -> int:
+        with self._lock:
+            return count_tokens(self._summary) + sum(count_tokens(m["content"]) for m in self.as_list())
+
+    def _evict_locked(self) -> None:
+        budget = self.token_budget - min(count_tokens(self._summary), self.summary_budget)
+        total = sum(count_tokens(m["content"]) for m in self._messages)
+        if total <= budget:
+            return
+        evicted = []
+        while len(self._messages) > self.min_recent and total > budget * EVICTION_LOW_WATER:
+            message = self._messages.popleft()
+            total -= count_tokens(message["content"])
+            evicted.append(message)
+        if not evicted or not self.summarize:
+            return
+        self._pending.extend(evicted)
+        del self._pending[:-MAX_PENDING_MESSAGES]
+
+    def _kick_summarizer_locked(self) -> None:
+        self._kick = True
+        if self._worker is None:
+            self._worker = threading.Thread(target=self._summarize_loop, name="conversation-summary", daemon=True)
+            self._worker.start()
+        self._wake.notify()
+
+    def _summarize_loop(self) -> None:
+        while True:
+            with self._wake:
+                while not (self._kick and self._pending):
+                    self._wake.wait()
+                self._kick = False
+                turns = list(self._pending)
+                summary = self._summary
+            updated = summarize_conversation(summary, turns, self.summary_budget)
+            if updated is None:
+                continue  # model unreachable: keep the turns and retry after the next turn
+            with self._wake:
+                # Turns evicted while we were summarizing stay pending for the next pass.
+                taken = {id(message) for message in turns}
+                self._pending = [message for message in self._pending if id(message) not in taken]
+                self._summary = updated
+                self.summaries_made += 1
+            try:
+                save_conversation_summary(updated)
+            except Exception as e:
+                print(f"Could not persist conversation summary: {e}")
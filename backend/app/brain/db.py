@@ -0,0 +1,111 @@
+import queue
+import sqlite3
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+
+# Applied to every connection. WAL lets readers run while the writer commits.
+_PRAGMAS = (
+    "PRAGMA busy_timeout = 5000",
+    "PRAGMA synchronous = NORMAL",
+    "PRAGMA temp_store = MEMORY",
+    "PRAGMA cache_size = -8000",
+    "PRAGMA mmap_size = 67108864",
+)
+STATEMENT_CACHE_SIZE = 256
+
+
+class ConnectionManager:
+    """One long-lived writer connection plus a small pool of reader connections.
+
+    Writes are serialized by a lock and wrapped in a transaction; reads borrow a
+    pooled connection and never wait on the writer thanks to WAL. Each connection
+    keeps its own prepared-statement cache (`cached_statements`).
+    """
+
+    def __init__(self, path: Path, readers: int = 3):
+        self.path = Path(path)
+        self.max_readers = max(1, readers)
+        self._write_lock = threading.RLock()
+        self._writer: sqlite3.Connection | None = None
+        self._readers: "queue.LifoQueue[sqlite3.Connection]" = queue.LifoQueue()
+        self._reader_count = 0
+        self._pool_lock = threading.Lock()
+        self._all: list[sqlite3.Connection] = []
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(
+            self.path,
+            check_same_thread=False,
+            timeout=5.0,
+            cached_statements=STATEMENT_CACHE_SIZE,
+        )
+        conn.row_factory = sqlite3.Row
+        for pragma in _PRAGMAS:
+            conn.execute(pragma)
+        with self._pool_lock:
+            self._all.append(conn)
+        return conn
+
+    def _get_writer(self) -> sqlite3.Connection:
+        if self._writer is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            conn = self._connect()
+            # Only takes effect for new databases; existing ones need one VACUUM to switch.
+            conn.execute("PRAGMA auto_vacuum = INCREMENTAL")
+            conn.execute("PRAGMA journal_mode = WAL")
+            self._writer = conn
+        return self._writer
+
+    @contextmanager
+    def writer(self):
+        """Exclusive writer connection inside a transaction (committed on success)."""
+        with self._write_lock:
+            conn = self._get_writer()
+            with conn:
+                yield conn
+
+    @contextmanager
+    def raw_writer(self):
+        """Exclusive writer connection outside any transaction (for VACUUM, pragmas)."""
+        with self._write_lock:
+            yield self._get_writer()
+
+    @contextmanager
+    def reader(self):
+        """Borrow a pooled reader connection; blocks only when all readers are busy."""
+        conn = self._acquire_reader()
+        try:
+            yield conn
+        finally:
+            if conn.in_transaction:
+                conn.rollback()
+            self._readers.put(conn)
+
+    def _acquire_reader(self) -> sqlite3.Connection:
+        try:
+            return self._readers.get_nowait()
+        except queue.Empty:
+            pass
+        with self._pool_lock:
+            create = self._reader_count < self.max_readers
+            if create:
+                self._reader_count += 1
+        if create:
+            # Make sure the database (and WAL mode) exists before the first reader opens it.
+            with self._write_lock:
+                self._get_writer()
+            return self._connect()
+        return self._readers.get()
+
+    def close(self) -> None:
+        with self._write_lock, self._pool_lock:
+            for conn in self._all:
+                try:
+                    conn.close()
+                except sqlite3.Error:
+                    pass
+            self._all.clear()
+            self._writer = None
+            self._reader_count = 0
+            self._readers = queue.LifoQueue()
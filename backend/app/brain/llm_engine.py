@@ -1,63 +1,662 @@
-import subprocess
+import asyncio
+import hashlib
+import json
 import os
+import socket
+import threading
+from collections.abc import AsyncIterator, Callable, Generator, Iterator
+from dataclasses import dataclass
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from app.brain.llm_scheduler import PRIORITY_BACKGROUND, PRIORITY_INTERACTIVE, LLMCancelled, scheduler
+from app.brain.single_flight import SingleFlight
+from app.brain.tokens import count_tokens, tokenizer_name, truncate_tokens
 
 OLLAMA_MODEL = os.getenv("OLLAMA_MODEL", "mistral:7b")
 OLLAMA_TIMEOUT_SECONDS = int(os.getenv("OLLAMA_TIMEOUT_SECONDS", "120"))
+OLLAMA_HOST = os.getenv("OLLAMA_HOST", "http://127.0.0.1:11434").rstrip("/")
+OLLAMA_KEEP_ALIVE = os.getenv("OLLAMA_KEEP_ALIVE", "30m")
+OLLAMA_CONNECT_TIMEOUT_SECONDS = float(os.getenv("OLLAMA_CONNECT_TIMEOUT_SECONDS", "3"))
+OLLAMA_POOL_SIZE = int(os.getenv("OLLAMA_POOL_SIZE", "4"))
+# Prompt size cap; keep it below the model context (num_ctx) minus room for the answer.
+PROMPT_TOKEN_BUDGET = int(os.getenv("ASSISTANT_PROMPT_TOKEN_BUDGET", "3000"))
+# How often an in-flight request checks its cancel event.
+_CANCEL_POLL_SECONDS = 0.05
+# Section labels and separators around the variable parts of the prompt.
+_FRAME_TOKENS = 40
+
+NO_RESPONSE_MESSAGE = "I could not get a response from Ollama."
+EMPTY_RESPONSE_MESSAGE = "I do not have a response right now."
+NOT_RUNNING_MESSAGE = (
+    "Ollama is not running. Start it with `ollama serve` and run `ollama pull mistral:7b`."
+)
+MODEL_MISSING_MESSAGE = f"The model {OLLAMA_MODEL} is not available. Run `ollama pull {OLLAMA_MODEL}`."
+TIMEOUT_MESSAGE = "The model took too long to respond."
+UNAVAILABLE_MESSAGE = "Sorry, my local thinking engine is not available."
+ERROR_MESSAGES = frozenset(
+    {
+        NO_RESPONSE_MESSAGE,
+        EMPTY_RESPONSE_MESSAGE,
+        NOT_RUNNING_MESSAGE,
+        MODEL_MISSING_MESSAGE,
+        TIMEOUT_MESSAGE,
+        UNAVAILABLE_MESSAGE,
+    }
+)
+
+
+def _format_turns(turns: list[dict]) -> str:
+    return "\n".join(f"{turn['role'].upper()}: {turn['content']}" for turn in turns if turn.get("content"))
+
+
+SYSTEM_PROMPT = (
+    "You are Jarvis, a human-like local offline assistant and practical agent.\n"
+    "Follow these rules:\n"
+    "- Be natural, clear, and friendly.\n"
+    "- Keep answers short by default (1-4 sentences), unless user asks for detail.\n"
+    "- Do not lecture, moralize, or push unrelated tasks.\n"
+    "- If a request is not supported, say it plainly and offer the closest action you can do now.\n"
+    "- If the user asks for an action, give an action-first response.\n"
+    "- Use saved memory context when relevant.\n"
+    "- If you are unsure, say so briefly.\n\n"
+)
+
+
+@dataclass
+class BuiltPrompt:
+    text: str
+    tokens: dict  # per-section token counts, total, budget and what was dropped
+
+
+def _fit_memory_context(memory_context: str, budget: int, item_cap: int) -> tuple[str, int]:
+    """Keep memory lines in order (they are ranked) until the budget runs out.
+
+    Blocks are "Header:\n- line\n- line"; a header is only kept with at least one line.
+    Returns the fitted text and the number of dropped lines.
+    """
+    kept_blocks, used, dropped = [], 0, 0
+    for block in (memory_context or "").split("\n\n"):
+        lines = [line for line in block.split("\n") if line.strip()]
+        if not lines:
+            continue
+        header, items = (lines[0], lines[1:]) if len(lines) > 1 else ("", lines)
+        header_cost = count_tokens(header) + 1 if header else 0
+        kept = []
+        for item in items:
+            item = truncate_tokens(item, item_cap)
+            cost = count_tokens(item) + 1
+            if used + header_cost + cost > budget:
+                dropped += 1
+                continue
+            kept.append(item)
+            used += cost
+        if kept:
+            used += header_cost
+            kept_blocks.append("\n".join(([header] if header else []) + kept))
+    return "\n\n".join(kept_blocks), dropped
+
+
+def build_prompt(
+    user_text: str,
+    conversation_history: list[dict] | None = None,
+    memory_context: str = "",
+    conversation_summary: str = "",
+    budget: int = PROMPT_TOKEN_BUDGET,
+) -> BuiltPrompt:
+    """Assemble the prompt within `budget` tokens, cutting the lowest-value parts first.
+
+    Layout is a fixed prefix (system rules, then the rolling summary) followed by the
+    append-only conversation; the per-turn memory context sits after the conversation,
+    right before the new message. Consecutive turns therefore share everything up to the
+    previous message and Ollama can reuse its KV cache for it instead of re-evaluating.
+
+    `conversation_history` holds the earlier turns only, not the message being answered.
+    The system rules and the user's message always go in. The rest is filled by priority:
+    the previous user/assistant exchange (shortened if a long message leaves little room), memory context (a quarter of the budget is reserved for it), the
+    summary, then older turns newest first. The history cut does not depend on this
+    turn's memory size, so the shared prefix stays stable. No single message or memory
+    line may take more than a quarter of the budget.
+    """
+    item_cap = max(32, budget // 4)
+    earlier = list(conversation_history or [])
+    # A trailing copy of this message would change the line just before MEMORY CONTEXT
+    # every turn and repeat the question after it; the message goes in as USER only.
+    if earlier and earlier[-1].get("role") == "user" and earlier[-1].get("content") == user_text:
+        earlier.pop()
+    user_text = truncate_tokens(user_text, max(32, budget // 2))
+    turns = [
+        {"role": turn["role"], "content": truncate_tokens(turn["content"], item_cap)}
+        for turn in earlier
+        if turn.get("content")
+    ]
+    fixed = count_tokens(SYSTEM_PROMPT) + count_tokens(user_text) + _FRAME_TOKENS
+    remaining = max(0, budget - fixed)
+
+    def _cost(turn: dict) -> int:
+        return count_tokens(turn["content"]) + 2
+
+    # The previous exchange is shortened rather than dropped when a long message crowds it.
+    recent = []
+    last_exchange = turns[-2:]
+    for index, turn in enumerate(reversed(last_exchange)):
+        share = remaining // (len(last_exchange) - index) - 2
+        content = truncate_tokens(turn["content"], share) if share > 0 else ""
+        if not content:
+            break
+        turn = {"role": turn["role"], "content": content}
+        recent.insert(0, turn)
+        remaining -= _cost(turn)
+
+    memory_reserve = min(remaining, budget // 4)
+    remaining -= memory_reserve
+
+    summary = truncate_tokens(conversation_summary, min(item_cap, remaining)) if conversation_summary else ""
+    remaining -= count_tokens(summary)
+
+    older = turns[: len(turns) - len(recent)] if len(recent) == min(2, len(turns)) else []
+    history = list(recent)
+    for turn in reversed(older):
+        if _cost(turn) > remaining:
+            break
+        history.insert(0, turn)
+        remaining -= _cost(turn)
+
+    memory_block, memory_dropped = _fit_memory_context(memory_context, remaining + memory_reserve, item_cap)
+
+    summary_block = f"EARLIER CONVERSATION (summary):\n{summary}\n\n" if summary else ""
+    history_block = "".join(f"{turn['role'].upper()}: {turn['content']}\n" for turn in history)
+    text = (
+        f"{SYSTEM_PROMPT}"
+        f"{summary_block}"
+        "CONVERSATION:\n"
+        f"{history_block}"
+        f"\nMEMORY CONTEXT (for this message):\n{memory_block or 'No relevant memory.'}\n\n"
+        f"USER: {user_text}\n"
+        "ASSISTANT:"
+    )
+    tokens = {
+        "system": count_tokens(SYSTEM_PROMPT),
+        "memory": count_tokens(memory_block),
+        "summary": count_tokens(summary),
+        "history": count_tokens(history_block),
+        "user": count_tokens(user_text),
+        "total": count_tokens(text),
+        "budget": budget,
+        "history_messages": len(history),
+        "history_dropped": len(turns) - len(history),
+        "memory_lines_dropped": memory_dropped,
+        "summary_truncated": summary != (conversation_summary or ""),
+        "tokenizer": tokenizer_name(),
+    }
+    return BuiltPrompt(text=text, tokens=tokens)
 
 
 def _build_prompt(
     user_text: str,
     conversation_history: list[dict] | None = None,
     memory_context: str = "",
+    conversation_summary: str = "",
 ) -> str:
-    history_block = ""
-    if conversation_history:
-        lines = [
-            f"{turn['role'].upper()}: {turn['content']}"
-            for turn in conversation_history[-20:]
-            if turn.get("content")
-        ]
-        history_block = "\n".join(lines)
+    return build_prompt(user_text, conversation_history, memory_context, conversation_summary).text
+
 
+def _build_summary_prompt(summary: str, turns: list[dict], max_words: int) -> str:
     return (
-        "You are Jarvis, a human-like local offline assistant and practical agent.\n"
-        "Follow these rules:\n"
-        "- Be natural, clear, and friendly.\n"
-        "- Keep answers short by default (1-4 sentences), unless user asks for detail.\n"
-        "- Do not lecture, moralize, or push unrelated tasks.\n"
-        "- If a request is not supported, say it plainly and offer the closest action you can do now.\n"
-        "- If the user asks for an action, give an action-first response.\n"
-        "- Use saved memory context when relevant.\n"
-        "- If you are unsure, say so briefly.\n\n"
-        f"MEMORY CONTEXT:\n{memory_context or 'No relevant memory.'}\n\n"
-        f"RECENT CONVERSATION:\n{history_block or 'No previous turns.'}\n\n"
-        f"USER: {user_text}\n"
-        "ASSISTANT:"
+        "You maintain a running summary of a conversation between a user and Jarvis, a local assistant.\n"
+        "Update the summary with the new turns. Keep facts, names, decisions, preferences and open\n"
+        "requests; drop greetings and small talk. Write plain prose in the third person, with no preamble,\n"
+        f"in at most {max_words} words.\n\n"
+        f"CURRENT SUMMARY:\n{summary or 'None yet.'}\n\n"
+        f"NEW TURNS:\n{_format_turns(turns)}\n\n"
+        "UPDATED SUMMARY:"
+    )
+
+
+async def _pump_async(make_tokens: Callable[[], Iterator[str]], cancel_event: threading.Event) -> AsyncIterator[str]:
+    """Drain a blocking token iterator in a worker thread; closing the consumer cancels it."""
+    loop = asyncio.get_running_loop()
+    tokens: asyncio.Queue = asyncio.Queue()
+    finished = object()
+
+    def _pump():
+        try:
+            for token in make_tokens():
+                loop.call_soon_threadsafe(tokens.put_nowait, token)
+        finally:
+            loop.call_soon_threadsafe(tokens.put_nowait, finished)
+
+    worker = threading.Thread(target=_pump, daemon=True)
+    worker.start()
+    try:
+        while True:
+            token = await tokens.get()
+            if token is finished:
+                break
+            yield token
+    finally:
+        cancel_event.set()
+
+
+class OllamaClient:
+    """Ollama HTTP API client that reuses pooled keep-alive connections across turns."""
+
+    def __init__(
+        self,
+        host: str = OLLAMA_HOST,
+        model: str = OLLAMA_MODEL,
+        keep_alive: str = OLLAMA_KEEP_ALIVE,
+        timeout_seconds: float = OLLAMA_TIMEOUT_SECONDS,
+        pool_size: int = OLLAMA_POOL_SIZE,
+        options: dict | None = None,
+    ):
+        self.host = host.rstrip("/")
+        self.model = model
+        self.keep_alive = keep_alive
+        self.timeout_seconds = timeout_seconds
+        self.pool_size = max(1, pool_size)
+        self.options = dict(options or {})
+        self._session: requests.Session | None = None
+        self._session_lock = threading.Lock()
+
+    def _get_session(self) -> requests.Session:
+        with self._session_lock:
+            if self._session is None:
+                session = requests.Session()
+                adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.pool_size)
+                session.mount("http://", adapter)
+                session.mount("https://", adapter)
+                self._session = session
+            return self._session
+
+    def close(self) -> None:
+        with self._session_lock:
+            if self._session is not None:
+                self._session.close()
+                self._session = None
+
+    def _payload(self, prompt: str, options: dict | None = None, stream: bool = False) -> dict:
+        payload = {
+            "model": self.model,
+            "prompt": prompt,
+            "stream": stream,
+            "keep_alive": self.keep_alive,
+        }
+        merged_options = {**self.options, **(options or {})}
+        if merged_options:
+            payload["options"] = merged_options
+        return payload
+
+    @staticmethod
+    def _metrics(data: dict) -> dict:
+        """Ollama's timing for a finished generation (durations are in nanoseconds)."""
+        return {
+            "prompt_eval_count": int(data.get("prompt_eval_count") or 0),
+            "prompt_eval_ms": (data.get("prompt_eval_duration") or 0) / 1e6,
+            "eval_count": int(data.get("eval_count") or 0),
+            "eval_ms": (data.get("eval_duration") or 0) / 1e6,
+            "total_ms": (data.get("total_duration") or 0) / 1e6,
+        }
+
+    def generate(
+        self,
+        prompt: str,
+        options: dict | None = None,
+        cancel_event: threading.Event | None = None,
+    ) -> str:
+        """Run one generation and return the text, or a friendly error message.
+
+        With a `cancel_event` the request is streamed under the hood so it can be
+        aborted mid-generation; the text produced so far is returned.
+        """
+        return self.generate_with_metrics(prompt, options, cancel_event)[0]
+
+    def generate_with_metrics(
+        self,
+        prompt: str,
+        options: dict | None = None,
+        cancel_event: threading.Event | None = None,
+    ) -> tuple[str, dict]:
+        """Like `generate`, plus this request's Ollama timings ({} if it did not finish)."""
+        if cancel_event is not None:
+            parts = []
+            tokens = self.stream(prompt, options, cancel_event)
+            while True:
+                try:
+                    parts.append(next(tokens))
+                except StopIteration as done:
+                    return "".join(parts).strip(), done.value or {}
+        try:
+            response = self._get_session().post(
+                f"{self.host}/api/generate",
+                json=self._payload(prompt, options),
+                timeout=(OLLAMA_CONNECT_TIMEOUT_SECONDS, self.timeout_seconds),
+            )
+        except requests.exceptions.ConnectionError:
+            return NOT_RUNNING_MESSAGE, {}
+        except requests.exceptions.Timeout:
+            return TIMEOUT_MESSAGE, {}
+        except Exception:
+            return UNAVAILABLE_MESSAGE, {}
+
+        if response.status_code == 404:
+            return MODEL_MISSING_MESSAGE, {}
+        if response.status_code != 200:
+            return NO_RESPONSE_MESSAGE, {}
+        try:
+            data = response.json()
+        except ValueError:
+            return NO_RESPONSE_MESSAGE, {}
+        text = (data.get("response") or "").strip()
+        return (text if text else EMPTY_RESPONSE_MESSAGE), self._metrics(data)
+
+    async def agenerate(self, prompt: str, options: dict | None = None) -> str:
+        """Async variant of `generate`; the blocking HTTP call runs in a worker thread."""
+        return await asyncio.to_thread(self.generate, prompt, options)
+
+    @staticmethod
+    def _abort_on_cancel(response: requests.Response, cancel_event: threading.Event | None) -> threading.Event:
+        """Shut the response socket down once `cancel_event` is set.
+
+        That unblocks a read stuck waiting for the next token and makes Ollama stop
+        generating. Set the returned event when the response is finished.
+        """
+        finished = threading.Event()
+        if cancel_event is None:
+            return finished
+
+        def _watch():
+            while not finished.is_set():
+                if cancel_event.wait(_CANCEL_POLL_SECONDS):
+                    if finished.is_set():
+                        return
+                    try:
+                        response.raw.connection.sock.shutdown(socket.SHUT_RDWR)
+                    except Exception:
+                        pass
+                    return
+
+        threading.Thread(target=_watch, name="llm-cancel-watch", daemon=True).start()
+        return finished
+
+    def stream(
+        self,
+        prompt: str,
+        options: dict | None = None,
+        cancel_event: threading.Event | None = None,
+    ) -> Generator[str, None, dict | None]:
+        """Yield response tokens as Ollama produces them.
+
+        Errors are reported as a single friendly-message token so callers can treat the
+        stream exactly like a normal answer. Setting `cancel_event` closes the HTTP
+        response, which makes Ollama abort the generation. The generator returns this
+        request's timings (`metrics = yield from client.stream(...)`), or None if the
+        generation did not finish.
+        """
+        try:
+            response = self._get_session().post(
+                f"{self.host}/api/generate",
+                json=self._payload(prompt, options, stream=True),
+                timeout=(OLLAMA_CONNECT_TIMEOUT_SECONDS, self.timeout_seconds),
+                stream=True,
+            )
+        except requests.exceptions.ConnectionError:
+            yield NOT_RUNNING_MESSAGE
+            return
+        except requests.exceptions.Timeout:
+            yield TIMEOUT_MESSAGE
+            return
+        except Exception:
+            yield UNAVAILABLE_MESSAGE
+            return
+
+        with response:
+            if response.status_code == 404:
+                yield MODEL_MISSING_MESSAGE
+                return
+            if response.status_code != 200:
+                yield NO_RESPONSE_MESSAGE
+                return
+
+            produced = False
+            metrics = None
+            finished = self._abort_on_cancel(response, cancel_event)
+            try:
+                for line in response.iter_lines():
+                    if cancel_event is not None and cancel_event.is_set():
+                        return
+                    if not line:
+                        continue
+                    chunk = json.loads(line)
+                    token = chunk.get("response") or ""
+                    if token:
+                        if not produced:
+                            token = token.lstrip()
+                        if token:
+                            produced = True
+                            yield token
+                    if chunk.get("done"):
+                        metrics = self._metrics(chunk)
+                        break
+            except requests.exceptions.Timeout:
+                if not produced:
+                    yield TIMEOUT_MESSAGE
+                return
+            except Exception:
+                if not produced and not (cancel_event is not None and cancel_event.is_set()):
+                    yield UNAVAILABLE_MESSAGE
+                return
+            finally:
+                finished.set()
+
+            if not produced:
+                yield EMPTY_RESPONSE_MESSAGE
+            return metrics
+
+    async def astream(
+        self,
+        prompt: str,
+        options: dict | None = None,
+        cancel_event: threading.Event | None = None,
+    ) -> AsyncIterator[str]:
+        """Async variant of `stream`; the blocking HTTP reads run in a worker thread."""
+        cancel_event = cancel_event or threading.Event()
+        async for token in _pump_async(lambda: self.stream(prompt, options, cancel_event), cancel_event):
+            yield token
+
+    def warmup(self) -> bool:
+        """Load the model into memory (empty prompt) so the first real turn skips model attach."""
+        try:
+            response = self._get_session().post(
+                f"{self.host}/api/generate",
+                json={"model": self.model, "keep_alive": self.keep_alive},
+                timeout=(OLLAMA_CONNECT_TIMEOUT_SECONDS, self.timeout_seconds),
+            )
+            return response.status_code == 200
+        except Exception:
+            return False
+
+
+_client = OllamaClient()
+_last_prompt_stats: dict = {}
+_last_generation_metrics: dict = {}
+_last_chat_prompt = ""
+_single_flight = SingleFlight()
+
+
+def get_client() -> OllamaClient:
+    return _client
+
+
+def get_last_prompt_stats() -> dict:
+    """Token counts per prompt section for the most recent turn."""
+    return dict(_last_prompt_stats)
+
+
+def get_llm_stats() -> dict:
+    """Scheduler queue/slot counters plus how many requests were coalesced."""
+    return {**scheduler.stats(), "single_flight": _single_flight.stats()}
+
+
+def get_last_generation_metrics() -> dict:
+    """Ollama's prompt-eval and eval timings for the most recent completed chat turn."""
+    return dict(_last_generation_metrics)
+
+
+def _record_generation(prompt_stats: dict, metrics: dict) -> None:
+    """Compare a chat turn's prompt size with what Ollama actually evaluated for it.
+
+    Tokens Ollama did not evaluate were served from its KV cache (the prefix shared
+    with the previous turn); the saving is priced at this turn's per-token eval speed.
+    """
+    global _last_generation_metrics
+    _last_generation_metrics = metrics
+    evaluated = metrics.get("prompt_eval_count", 0)
+    if not evaluated:
+        return
+    total = max(prompt_stats.get("total", 0), evaluated)
+    cached = total - evaluated
+    saved_ms = cached * metrics["prompt_eval_ms"] / evaluated
+    prompt_stats.update(
+        {
+            "prompt_eval_count": evaluated,
+            "prompt_eval_ms": metrics["prompt_eval_ms"],
+            "cached_tokens": cached,
+            "prompt_eval_saved_ms": saved_ms,
+        }
+    )
+    print(
+        f"LLM prompt eval: {evaluated} of ~{total} tokens in {metrics['prompt_eval_ms']:.0f}ms "
+        f"(~{cached} cached, ~{saved_ms:.0f}ms saved)"
+    )
+
+
+def _scheduled_stream(built: BuiltPrompt, priority: int, cancel_event: threading.Event) -> Iterator[str]:
+    """Stream `prompt` once the scheduler grants a slot; nothing is yielded if cancelled first.
+
+    Timings are recorded from this request's own final chunk, and only if it finished.
+    """
+    try:
+        with scheduler.slot(priority, cancel_event):
+            metrics = yield from _client.stream(built.text, cancel_event=cancel_event)
+    except LLMCancelled:
+        return
+    if metrics and not cancel_event.is_set():
+        _record_generation(built.tokens, metrics)
+
+
+def _note_prompt(built: BuiltPrompt) -> None:
+    global _last_prompt_stats, _last_chat_prompt
+    tokens = built.tokens
+    # Text shared with the previous chat prompt is what the server can serve from its KV cache.
+    tokens["shared_prefix"] = count_tokens(os.path.commonprefix([_last_chat_prompt, built.text]))
+    _last_chat_prompt = built.text
+    _last_prompt_stats = tokens
+    print(
+        f"LLM prompt: {tokens['total']}/{tokens['budget']} tokens (system {tokens['system']}, "
+        f"memory {tokens['memory']}, summary {tokens['summary']}, history {tokens['history']} "
+        f"in {tokens['history_messages']} messages, user {tokens['user']}; "
+        f"dropped {tokens['history_dropped']} messages, {tokens['memory_lines_dropped']} memory lines; "
+        f"{tokens['shared_prefix']} shared with the previous turn)"
     )
 
 
+def stream_prompt(
+    built: BuiltPrompt,
+    cancel_event: threading.Event | None = None,
+    priority: int = PRIORITY_INTERACTIVE,
+) -> Iterator[str]:
+    """Stream a prompt from `build_prompt`, joining an identical request already generating.
+
+    Duplicate sends (double clicks, several clients asking the same thing) then share
+    one generation and one scheduler slot instead of each occupying the model. Once the
+    generation finishes, `built.tokens` also holds Ollama's prompt-eval numbers for it.
+    """
+    key = hashlib.sha1(f"{_client.model}\x00{built.text}".encode("utf-8")).hexdigest()
+
+    def _produce(flight_cancel: threading.Event) -> Iterator[str]:
+        _note_prompt(built)
+        yield from _scheduled_stream(built, priority, flight_cancel)
+
+    return _single_flight.stream(key, _produce, cancel_event)
+
+
+def ask_prompt(
+    built: BuiltPrompt,
+    cancel_event: threading.Event | None = None,
+    priority: int = PRIORITY_INTERACTIVE,
+) -> str:
+    """Answer a prompt from `build_prompt`; returns "" if cancelled before a slot frees up."""
+    return "".join(stream_prompt(built, cancel_event, priority)).strip()
+
+
 def ask_llm(
     user_text: str,
     conversation_history: list[dict] | None = None,
     memory_context: str = "",
+    conversation_summary: str = "",
+    cancel_event: threading.Event | None = None,
+    priority: int = PRIORITY_INTERACTIVE,
 ) -> str:
-    prompt = _build_prompt(user_text, conversation_history, memory_context)
+    """Answer `user_text`; returns "" if `cancel_event` is set before a slot frees up."""
+    built = build_prompt(user_text, conversation_history, memory_context, conversation_summary)
+    return ask_prompt(built, cancel_event, priority)
+
+
+async def ask_llm_async(
+    user_text: str,
+    conversation_history: list[dict] | None = None,
+    memory_context: str = "",
+    conversation_summary: str = "",
+    cancel_event: threading.Event | None = None,
+    priority: int = PRIORITY_INTERACTIVE,
+) -> str:
+    return await asyncio.to_thread(
+        ask_llm, user_text, conversation_history, memory_context, conversation_summary, cancel_event, priority
+    )
+
+
+def stream_llm(
+    user_text: str,
+    conversation_history: list[dict] | None = None,
+    memory_context: str = "",
+    conversation_summary: str = "",
+    cancel_event: threading.Event | None = None,
+    priority: int = PRIORITY_INTERACTIVE,
+) -> Iterator[str]:
+    built = build_prompt(user_text, conversation_history, memory_context, conversation_summary)
+    return stream_prompt(built, cancel_event, priority)
+
+
+def astream_llm(
+    user_text: str,
+    conversation_history: list[dict] | None = None,
+    memory_context: str = "",
+    conversation_summary: str = "",
+    cancel_event: threading.Event | None = None,
+    priority: int = PRIORITY_INTERACTIVE,
+) -> AsyncIterator[str]:
+    built = build_prompt(user_text, conversation_history, memory_context, conversation_summary)
+    cancel_event = cancel_event or threading.Event()
+    return _pump_async(lambda: stream_prompt(built, cancel_event, priority), cancel_event)
+
+
+def summarize_conversation(summary: str, turns: list[dict], max_tokens: int = 250) -> str | None:
+    """Fold `turns` into the running `summary`.
+
+    Runs at background priority, so a user request arriving meanwhile preempts it.
+    Returns None if the model could not be reached or the summary was preempted.
+    """
+    prompt = _build_summary_prompt(summary, turns, max_words=max(20, max_tokens * 3 // 4))
+    cancel_event = threading.Event()
     try:
-        result = subprocess.run(
-            ["ollama", "run", OLLAMA_MODEL],
-            input=prompt,
-            capture_output=True,
-            text=True,
-            encoding="utf-8",
-            timeout=OLLAMA_TIMEOUT_SECONDS,
-        )
-        if result.returncode != 0:
-            return "I could not get a response from Ollama."
-        response = result.stdout.strip()
-        return response if response else "I do not have a response right now."
-    except FileNotFoundError:
-        return "Ollama is not installed or not in PATH. Please install Ollama and run `ollama pull mistral:7b`."
-    except subprocess.TimeoutExpired:
-        return "The model took too long to respond."
-    except Exception:
-        return "Sorry, my local thinking engine is not available."
+        with scheduler.slot(PRIORITY_BACKGROUND, cancel_event):
+            text = _client.generate(
+                prompt, options={"num_predict": max_tokens, "temperature": 0.2}, cancel_event=cancel_event
+            )
+    except LLMCancelled:
+        return None
+    if cancel_event.is_set() or not text or text in ERROR_MESSAGES:
+        return None
+    return text
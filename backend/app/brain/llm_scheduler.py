@@ -0,0 +1,106 @@
+import heapq
+import itertools
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+LLM_MAX_CONCURRENCY = int(os.getenv("ASSISTANT_LLM_MAX_CONCURRENCY", "1"))
+# Lower value = served first.
+PRIORITY_INTERACTIVE = 0
+PRIORITY_BACKGROUND = 10
+_POLL_SECONDS = 0.05
+
+
+class LLMCancelled(Exception):
+    """The request's cancel event was set before it got a slot."""
+
+
+class LLMScheduler:
+    """Admits LLM requests in priority order, at most `max_concurrency` at a time.
+
+    Every request carries a cancellation token (a `threading.Event`). Waiting requests
+    leave the queue as soon as their token is set. When an interactive request has to
+    wait, running background requests are cancelled so the slot frees up quickly.
+    """
+
+    def __init__(self, max_concurrency: int = LLM_MAX_CONCURRENCY):
+        self.max_concurrency = max(1, max_concurrency)
+        self._cond = threading.Condition()
+        self._waiting: list[tuple[int, int]] = []
+        self._order = itertools.count()
+        self._running: dict[int, tuple[int, threading.Event]] = {}
+        self._stats = {
+            "submitted": 0,
+            "completed": 0,
+            "cancelled_waiting": 0,
+            "preempted": 0,
+            "max_queue_depth": 0,
+            "total_wait_ms": 0.0,
+        }
+
+    def _preempt_background_locked(self, priority: int) -> None:
+        for running_priority, cancel_event in self._running.values():
+            if running_priority > priority and not cancel_event.is_set():
+                cancel_event.set()
+                self._stats["preempted"] += 1
+
+    def acquire(self, priority: int, cancel_event: threading.Event) -> int:
+        """Wait for a slot; returns a ticket for `release`. Raises LLMCancelled."""
+        started = time.perf_counter()
+        with self._cond:
+            ticket = next(self._order)
+            entry = (priority, ticket)
+            heapq.heappush(self._waiting, entry)
+            self._stats["submitted"] += 1
+            self._stats["max_queue_depth"] = max(self._stats["max_queue_depth"], len(self._waiting))
+            try:
+                while True:
+                    if cancel_event.is_set():
+                        self._stats["cancelled_waiting"] += 1
+                        raise LLMCancelled()
+                    if len(self._running) < self.max_concurrency and self._waiting[0] == entry:
+                        break
+                    if len(self._running) >= self.max_concurrency:
+                        self._preempt_background_locked(priority)
+                    self._cond.wait(_POLL_SECONDS)
+                heapq.heappop(self._waiting)
+            except LLMCancelled:
+                self._waiting.remove(entry)
+                heapq.heapify(self._waiting)
+                self._cond.notify_all()
+                raise
+            self._running[ticket] = (priority, cancel_event)
+            self._stats["total_wait_ms"] += (time.perf_counter() - started) * 1000
+            self._cond.notify_all()
+            return ticket
+
+    def release(self, ticket: int) -> None:
+        with self._cond:
+            if self._running.pop(ticket, None) is not None:
+                self._stats["completed"] += 1
+            self._cond.notify_all()
+
+    @contextmanager
+    def slot(self, priority: int = PRIORITY_INTERACTIVE, cancel_event: threading.Event | None = None):
+        """Hold a slot for the duration of the block; yields the request's cancel event."""
+        cancel_event = cancel_event or threading.Event()
+        ticket = self.acquire(priority, cancel_event)
+        try:
+            yield cancel_event
+        finally:
+            self.release(ticket)
+
+    def stats(self) -> dict:
+        with self._cond:
+            stats = dict(self._stats)
+            stats["queue_depth"] = len(self._waiting)
+            stats["running"] = len(self._running)
+            stats["max_concurrency"] = self.max_concurrency
+        admitted = stats["submitted"] - stats["cancelled_waiting"] - stats["queue_depth"]
+        total_wait_ms = stats.pop("total_wait_ms")
+        stats["avg_wait_ms"] = total_wait_ms / admitted if admitted > 0 else 0.0
+        return stats
+
+
+scheduler = LLMScheduler()
@@ -0,0 +1,89 @@
+import threading
+import time
+from typing import Callable
+
+
+class MaintenanceScheduler:
+    """Runs registered housekeeping jobs on one daemon thread.
+
+    Each job runs every `interval` seconds, and sooner when `request(name)` is
+    called (e.g. a write path noticed a high-water mark was crossed). Jobs never
+    run on the caller's thread, so the writes that trigger them stay fast.
+    """
+
+    def __init__(self, name: str = "memory-maintenance"):
+        self.name = name
+        self._jobs: dict[str, tuple[Callable[[], object], float]] = {}
+        self._due: dict[str, float] = {}
+        self._requested: set[str] = set()
+        self._runs: dict[str, int] = {}
+        self._last_error: dict[str, str] = {}
+        self._wake = threading.Condition()
+        self._thread: threading.Thread | None = None
+        self._stopped = False
+
+    def register(self, name: str, job: Callable[[], object], interval: float, run_at_start: bool = True) -> None:
+        with self._wake:
+            self._jobs[name] = (job, interval)
+            self._due[name] = time.monotonic() if run_at_start else time.monotonic() + interval
+            self._runs.setdefault(name, 0)
+            self._wake.notify()
+
+    def request(self, name: str) -> None:
+        with self._wake:
+            if name in self._jobs:
+                self._requested.add(name)
+                self._wake.notify()
+
+    def start(self) -> None:
+        with self._wake:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._stopped = False
+            self._thread = threading.Thread(target=self._run, name=self.name, daemon=True)
+            self._thread.start()
+
+    def stop(self, timeout: float = 2.0) -> None:
+        with self._wake:
+            self._stopped = True
+            self._wake.notify()
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def stats(self) -> dict:
+        with self._wake:
+            return {"runs": dict(self._runs), "last_error": dict(self._last_error)}
+
+    def _next_job(self) -> str | None:
+        """Wait for a requested or due job; returns None when stopped."""
+        with self._wake:
+            while not self._stopped:
+                if self._requested:
+                    return self._requested.pop()
+                now = time.monotonic()
+                due = [name for name, at in self._due.items() if at <= now]
+                if due:
+                    return min(due, key=self._due.get)
+                timeout = min(self._due.values()) - now if self._due else None
+                self._wake.wait(timeout)
+            return None
+
+    def _run(self) -> None:
+        while True:
+            name = self._next_job()
+            if name is None:
+                return
+            job, interval = self._jobs[name]
+            error = None
+            try:
+                job()
+            except Exception as e:
+                error = str(e)
+                print(f"Maintenance job '{name}' failed: {e}")
+            with self._wake:
+                self._runs[name] += 1
+                self._due[name] = time.monotonic() + interval
+                if error is None:
+                    self._last_error.pop(name, None)
+                else:
+                    self._last_error[name] = error
@@ -1,16 +1,102 @@
+import itertools
+import math
 import os
+import re
 import sqlite3
 import threading
+import time
 from collections import deque
 from datetime import datetime, timedelta
 from pathlib import Path
+from typing import Iterable, Iterator
+
+from app.brain.db import ConnectionManager
+from app.brain.maintenance import MaintenanceScheduler
+from app.brain.vector_index import VectorIndex
 
-_lock = threading.RLock()
 _backend_dir = Path(__file__).resolve().parents[2]
 DB_PATH = Path(os.getenv("ASSISTANT_MEMORY_DB", str(_backend_dir / "assistant_memory.db")))
 MAX_NOTES = int(os.getenv("ASSISTANT_MAX_NOTES", "5000"))
 MAX_TASKS = int(os.getenv("ASSISTANT_MAX_TASKS", "10000"))
 DONE_TASK_RETENTION_DAYS = int(os.getenv("ASSISTANT_DONE_TASK_RETENTION_DAYS", "90"))
+MEMORY_READERS = int(os.getenv("ASSISTANT_MEMORY_READERS", "3"))
+# Retention is enforced by a background job: on this interval, or once a table
+# grows this many rows past its cap. Deletes run in small batches.
+MAINTENANCE_INTERVAL_SECONDS = float(os.getenv("ASSISTANT_MAINTENANCE_INTERVAL_SECONDS", "600"))
+PRUNE_SLACK_ROWS = int(os.getenv("ASSISTANT_PRUNE_SLACK_ROWS", "100"))
+PRUNE_BATCH_SIZE = int(os.getenv("ASSISTANT_PRUNE_BATCH_SIZE", "500"))
+# Free pages are returned to the OS a few at a time instead of a blocking full VACUUM.
+VACUUM_INTERVAL_SECONDS = float(os.getenv("ASSISTANT_VACUUM_INTERVAL_SECONDS", "300"))
+VACUUM_STEP_PAGES = int(os.getenv("ASSISTANT_VACUUM_STEP_PAGES", "256"))
+VACUUM_BUDGET_MS = float(os.getenv("ASSISTANT_VACUUM_BUDGET_MS", "50"))
+IMPORT_CHUNK_ROWS = 5000
+BACKUP_DIR = Path(os.getenv("ASSISTANT_MEMORY_BACKUP_DIR", str(_backend_dir / "backups")))
+# Weight of recency relative to BM25 text relevance when ranking notes (0 disables it).
+NOTES_RECENCY_WEIGHT = float(os.getenv("ASSISTANT_NOTES_RECENCY_WEIGHT", "0.3"))
+NOTES_RECENCY_HALF_LIFE_DAYS = float(os.getenv("ASSISTANT_NOTES_RECENCY_HALF_LIFE_DAYS", "30"))
+_SEARCH_STOP_WORDS = {
+    "a", "an", "and", "are", "about", "do", "does", "for", "i", "in", "is", "it", "me",
+    "my", "of", "on", "or", "the", "to", "what", "when", "where", "who", "you", "your",
+}
+SEMANTIC_MEMORY = os.getenv("ASSISTANT_SEMANTIC_MEMORY", "1") != "0"
+SEMANTIC_MIN_SCORE = float(os.getenv("ASSISTANT_SEMANTIC_MIN_SCORE", "0.35"))
+VECTOR_INDEX_PREFIX = DB_PATH.parent / f"{DB_PATH.stem}_vectors"
+_fts_enabled = False
+# Set by the background loader once the embedder is up and the index matches the DB.
+_vectors: VectorIndex | None = None
+
+_db = ConnectionManager(DB_PATH, readers=MEMORY_READERS)
+_maintenance = MaintenanceScheduler()
+# Upper bounds on row counts since the last retention pass (deletes only lower the real count).
+_row_estimates = {"notes": 0, "tasks": 0}
+_row_estimates_lock = threading.Lock()
+
+
+class _LookupCache:
+    """Small in-process cache for rarely changing lookups, kept current by the writers.
+
+    A generation counter stops a reader that raced a write from storing the stale
+    value it loaded before the write landed.
+    """
+
+    def __init__(self):
+        self._values: dict = {}
+        self._generation = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key, load):
+        with self._lock:
+            if key in self._values:
+                self.hits += 1
+                return self._values[key]
+            self.misses += 1
+            generation = self._generation
+        value = load()
+        with self._lock:
+            if generation == self._generation:
+                self._values[key] = value
+        return value
+
+    def set(self, key, value) -> None:
+        with self._lock:
+            self._generation += 1
+            self._values[key] = value
+
+    def invalidate(self) -> None:
+        with self._lock:
+            self._generation += 1
+            self._values.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses, "entries": len(self._values)}
+
+
+_profile_cache = _LookupCache()
+# Keyed by list limit; only the pending list is cached (it feeds every task-related prompt).
+_pending_tasks_cache = _LookupCache()
 
 
 class ShortTermMemory:
@@ -27,15 +113,8 @@ class ShortTermMemory:
             return list(self._messages)
 
 
-def _get_connection() -> sqlite3.Connection:
-    conn = sqlite3.connect(DB_PATH, check_same_thread=False)
-    conn.row_factory = sqlite3.Row
-    return conn
-
-
 def init_memory_db() -> None:
-    DB_PATH.parent.mkdir(parents=True, exist_ok=True)
-    with _lock, _get_connection() as conn:
+    with _db.writer() as conn:
         conn.executescript(
             """
             CREATE TABLE IF NOT EXISTS profile (
@@ -58,15 +137,180 @@ def init_memory_db() -> None:
                 updated_at TEXT NOT NULL
             );
 
+            CREATE TABLE IF NOT EXISTS conversation_summary (
+                id INTEGER PRIMARY KEY CHECK (id = 1),
+                summary TEXT NOT NULL,
+                updated_at TEXT NOT NULL
+            );
+
+            CREATE TABLE IF NOT EXISTS llm_response_cache (
+                key TEXT PRIMARY KEY,
+                response TEXT NOT NULL,
+                created_at REAL NOT NULL
+            );
+
             CREATE INDEX IF NOT EXISTS idx_notes_created_at ON notes(created_at);
             CREATE INDEX IF NOT EXISTS idx_tasks_status_updated ON tasks(status, updated_at);
             """
         )
+    _init_counters()
+    _init_notes_fts()
+    _init_semantic_memory()
+    _maintenance.register("retention", _run_retention, MAINTENANCE_INTERVAL_SECONDS)
+    _maintenance.register("vacuum", _run_vacuum, VACUUM_INTERVAL_SECONDS)
+    _maintenance.start()
+
+
+def _init_counters() -> None:
+    """Row counters kept by triggers, so stats never scan whole tables.
+
+    Seeded from COUNT(*) once, in the same transaction that creates the triggers.
+    """
+    with _db.writer() as conn:
+        existed = conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'memory_counters'"
+        ).fetchone()
+        if existed:
+            return
+        conn.executescript(
+            """
+            BEGIN IMMEDIATE;
+
+            CREATE TABLE memory_counters (
+                name TEXT PRIMARY KEY,
+                value INTEGER NOT NULL
+            );
+
+            INSERT INTO memory_counters(name, value)
+            SELECT 'profile', COUNT(*) FROM profile
+            UNION ALL SELECT 'notes', COUNT(*) FROM notes
+            UNION ALL SELECT 'tasks', COUNT(*) FROM tasks
+            UNION ALL SELECT 'done_tasks', COUNT(*) FROM tasks WHERE status = 'done';
+
+            CREATE TRIGGER IF NOT EXISTS profile_count_insert AFTER INSERT ON profile BEGIN
+                UPDATE memory_counters SET value = value + 1 WHERE name = 'profile';
+            END;
+
+            CREATE TRIGGER IF NOT EXISTS profile_count_delete AFTER DELETE ON profile BEGIN
+                UPDATE memory_counters SET value = value - 1 WHERE name = 'profile';
+            END;
+
+            CREATE TRIGGER IF NOT EXISTS notes_count_insert AFTER INSERT ON notes BEGIN
+                UPDATE memory_counters SET value = value + 1 WHERE name = 'notes';
+            END;
+
+            CREATE TRIGGER IF NOT EXISTS notes_count_delete AFTER DELETE ON notes BEGIN
+                UPDATE memory_counters SET value = value - 1 WHERE name = 'notes';
+            END;
+
+            CREATE TRIGGER IF NOT EXISTS tasks_count_insert AFTER INSERT ON tasks BEGIN
+                UPDATE memory_counters SET value = value + 1 WHERE name = 'tasks';
+                UPDATE memory_counters SET value = value + (new.status = 'done') WHERE name = 'done_tasks';
+            END;
+
+            CREATE TRIGGER IF NOT EXISTS tasks_count_delete AFTER DELETE ON tasks BEGIN
+                UPDATE memory_counters SET value = value - 1 WHERE name = 'tasks';
+                UPDATE memory_counters SET value = value - (old.status = 'done') WHERE name = 'done_tasks';
+            END;
+
+            CREATE TRIGGER IF NOT EXISTS tasks_count_status AFTER UPDATE OF status ON tasks
+            WHEN (old.status = 'done') != (new.status = 'done') BEGIN
+                UPDATE memory_counters
+                SET value = value + (new.status = 'done') - (old.status = 'done')
+                WHERE name = 'done_tasks';
+            END;
+
+            COMMIT;
+            """
+        )
+
+
+def _read_counters(conn: sqlite3.Connection) -> dict[str, int]:
+    return {row["name"]: int(row["value"]) for row in conn.execute("SELECT name, value FROM memory_counters")}
+
+
+_NOTES_FTS_INSERT_TRIGGER = """
+CREATE TRIGGER IF NOT EXISTS notes_fts_insert AFTER INSERT ON notes BEGIN
+    INSERT INTO notes_fts(rowid, content) VALUES (new.id, new.content);
+END"""
+
+
+def _init_notes_fts() -> None:
+    """Create the FTS5 index over notes, kept in sync by triggers.
+
+    Databases created before the index existed are migrated by rebuilding it from
+    the notes table once. Builds of SQLite without FTS5 fall back to LIKE search.
+    """
+    global _fts_enabled
+    with _db.writer() as conn:
+        existed = conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'notes_fts'"
+        ).fetchone()
+        try:
+            conn.executescript(
+                f"""
+                CREATE VIRTUAL TABLE IF NOT EXISTS notes_fts USING fts5(
+                    content,
+                    content='notes',
+                    content_rowid='id',
+                    tokenize='porter unicode61'
+                );
+
+                {_NOTES_FTS_INSERT_TRIGGER};
+
+                CREATE TRIGGER IF NOT EXISTS notes_fts_delete AFTER DELETE ON notes BEGIN
+                    INSERT INTO notes_fts(notes_fts, rowid, content)
+                    VALUES ('delete', old.id, old.content);
+                END;
+
+                CREATE TRIGGER IF NOT EXISTS notes_fts_update AFTER UPDATE OF content ON notes BEGIN
+                    INSERT INTO notes_fts(notes_fts, rowid, content)
+                    VALUES ('delete', old.id, old.content);
+                    INSERT INTO notes_fts(rowid, content) VALUES (new.id, new.content);
+                END;
+                """
+            )
+        except sqlite3.OperationalError:
+            _fts_enabled = False
+            return
+        if not existed:
+            conn.execute("INSERT INTO notes_fts(notes_fts) VALUES ('rebuild')")
+    _fts_enabled = True
+
+
+def _init_semantic_memory() -> None:
+    """Load the embedder and vector index off the startup path, then catch up with the DB."""
+
+    def _load():
+        global _vectors
+        try:
+            index = VectorIndex(VECTOR_INDEX_PREFIX)
+            with _db.reader() as conn:
+                notes = [(row["id"], row["content"]) for row in conn.execute("SELECT id, content FROM notes")]
+            index.sync(notes)
+            _vectors = index
+            # Writes during the load skipped the index (it was None); catch up with them once.
+            loaded_max = max((note_id for note_id, _ in notes), default=0)
+            with _db.reader() as conn:
+                present = {row["id"] for row in conn.execute("SELECT id FROM notes")}
+                added = [
+                    (row["id"], row["content"])
+                    for row in conn.execute("SELECT id, content FROM notes WHERE id > ?", (loaded_max,))
+                ]
+            index.remove(index.ids() - present)
+            if added:
+                index.add(added)
+        except Exception as e:
+            print(f"Semantic memory unavailable: {e}")
+
+    if SEMANTIC_MEMORY:
+        threading.Thread(target=_load, name="semantic-memory", daemon=True).start()
 
 
 def upsert_profile(key: str, value: str) -> None:
     now = datetime.utcnow().isoformat(timespec="seconds")
-    with _lock, _get_connection() as conn:
+    key, value = key.strip().lower(), value.strip()
+    with _db.writer() as conn:
         conn.execute(
             """
             INSERT INTO profile(key, value, updated_at)
@@ -75,34 +319,150 @@ def upsert_profile(key: str, value: str) -> None:
                 value = excluded.value,
                 updated_at = excluded.updated_at
             """,
-            (key.strip().lower(), value.strip(), now),
+            (key, value, now),
         )
+    _profile_cache.set(key, value)
 
 
 def get_profile(key: str) -> str | None:
-    with _lock, _get_connection() as conn:
-        row = conn.execute(
-            "SELECT value FROM profile WHERE key = ?",
-            (key.strip().lower(),),
-        ).fetchone()
+    key = key.strip().lower()
+    return _profile_cache.get(key, lambda: _load_profile(key))
+
+
+def _load_profile(key: str) -> str | None:
+    with _db.reader() as conn:
+        row = conn.execute("SELECT value FROM profile WHERE key = ?", (key,)).fetchone()
         return row["value"] if row else None
 
 
+def get_conversation_summary() -> str:
+    with _db.reader() as conn:
+        row = conn.execute("SELECT summary FROM conversation_summary WHERE id = 1").fetchone()
+        return row["summary"] if row else ""
+
+
+def save_conversation_summary(summary: str) -> None:
+    now = datetime.utcnow().isoformat(timespec="seconds")
+    with _db.writer() as conn:
+        conn.execute(
+            """
+            INSERT INTO conversation_summary(id, summary, updated_at)
+            VALUES (1, ?, ?)
+            ON CONFLICT(id) DO UPDATE SET
+                summary = excluded.summary,
+                updated_at = excluded.updated_at
+            """,
+            (summary.strip(), now),
+        )
+
+
+def load_cached_responses(limit: int) -> list[tuple[str, str, float]]:
+    """Most recent LLM response cache entries as (key, response, created_at), oldest first."""
+    with _db.reader() as conn:
+        rows = conn.execute(
+            "SELECT key, response, created_at FROM llm_response_cache ORDER BY created_at DESC LIMIT ?",
+            (limit,),
+        ).fetchall()
+    return [(row["key"], row["response"], row["created_at"]) for row in reversed(rows)]
+
+
+def save_cached_response(key: str, response: str, created_at: float) -> None:
+    with _db.writer() as conn:
+        conn.execute(
+            "INSERT OR REPLACE INTO llm_response_cache(key, response, created_at) VALUES (?, ?, ?)",
+            (key, response, created_at),
+        )
+
+
+def delete_cached_responses(keys: list[str]) -> None:
+    with _db.writer() as conn:
+        conn.executemany("DELETE FROM llm_response_cache WHERE key = ?", [(key,) for key in keys])
+
+
 def add_note(content: str) -> int:
     now = datetime.utcnow().isoformat(timespec="seconds")
-    with _lock, _get_connection() as conn:
+    with _db.writer() as conn:
         cursor = conn.execute(
             "INSERT INTO notes(content, created_at) VALUES (?, ?)",
             (content.strip(), now),
         )
         note_id = int(cursor.lastrowid)
-        _prune_notes(conn)
-        return note_id
+    if _vectors is not None:
+        _vectors.add([(note_id, content.strip())])
+    _note_inserted("notes", MAX_NOTES)
+    return note_id
+
+
+def _fts_terms(query: str) -> list[str]:
+    terms = [t for t in re.findall(r"\w+", query.lower()) if t not in _SEARCH_STOP_WORDS]
+    return list(dict.fromkeys(terms))
+
+
+def _recency(created_at: str, now: datetime) -> float:
+    try:
+        age_days = (now - datetime.fromisoformat(created_at)).total_seconds() / 86400
+    except ValueError:
+        return 0.0
+    return math.pow(0.5, max(age_days, 0.0) / NOTES_RECENCY_HALF_LIFE_DAYS)
 
 
 def search_notes(query: str, limit: int = 5) -> list[dict]:
+    """Find notes matching `query`, best first.
+
+    Uses the FTS5 index with BM25 relevance blended with recency; falls back to a
+    substring scan when FTS5 is unavailable or the query has no searchable terms
+    (an empty query lists the most recent notes).
+    """
+    if not _fts_enabled:
+        return _search_notes_like(query, limit)
+
+    terms = _fts_terms(query)
+    if not terms:
+        return _search_notes_like(query, limit)
+    quoted = [f'"{term}"' for term in terms]
+    candidates = max(limit * 4, 20)
+    # Notes containing every term are cheap to find (doclist intersection) and rank
+    # best anyway; only fall back to the costlier OR query when there are too few.
+    rows = _match_notes(" AND ".join(quoted), candidates)
+    if len(rows) < limit and len(quoted) > 1:
+        rows = _match_notes(" OR ".join(quoted), candidates)
+    if not rows:
+        return []
+
+    # bm25() is negative (more negative = better); scale it to 0..1 within the candidates.
+    best = min(row["rank"] for row in rows) or -1.0
+    now = datetime.utcnow()
+    scored = []
+    for row in rows:
+        relevance = row["rank"] / best
+        score = relevance + NOTES_RECENCY_WEIGHT * _recency(row["created_at"], now)
+        scored.append((score, row["id"], row))
+    scored.sort(key=lambda item: (item[0], item[1]), reverse=True)
+    return [
+        {"id": row["id"], "content": row["content"], "created_at": row["created_at"]}
+        for _, _, row in scored[:limit]
+    ]
+
+
+def _match_notes(match: str, limit: int) -> list[sqlite3.Row]:
+    # Newest first among equal scores, so the recency blend sees the latest matches.
+    with _db.reader() as conn:
+        return conn.execute(
+            """
+            SELECT notes.id, notes.content, notes.created_at, bm25(notes_fts) AS rank
+            FROM notes_fts
+            JOIN notes ON notes.id = notes_fts.rowid
+            WHERE notes_fts MATCH ?
+            ORDER BY rank, notes_fts.rowid DESC
+            LIMIT ?
+            """,
+            (match, limit),
+        ).fetchall()
+
+
+def _search_notes_like(query: str, limit: int) -> list[dict]:
     pattern = f"%{query.strip()}%"
-    with _lock, _get_connection() as conn:
+    with _db.reader() as conn:
         rows = conn.execute(
             """
             SELECT id, content, created_at
@@ -116,9 +476,28 @@ def search_notes(query: str, limit: int = 5) -> list[dict]:
     return [dict(row) for row in rows]
 
 
+def semantic_search_notes(query: str, limit: int = 5, min_score: float = SEMANTIC_MIN_SCORE) -> list[dict]:
+    """Notes closest in meaning to `query` by embedding cosine similarity, best first."""
+    if _vectors is None or not (query or "").strip():
+        return []
+    hits = _vectors.search(query, limit=limit, min_score=min_score)
+    if not hits:
+        return []
+    placeholders = ",".join("?" for _ in hits)
+    with _db.reader() as conn:
+        rows = {
+            row["id"]: dict(row)
+            for row in conn.execute(
+                f"SELECT id, content, created_at FROM notes WHERE id IN ({placeholders})",
+                [note_id for note_id, _ in hits],
+            )
+        }
+    return [rows[note_id] for note_id, _ in hits if note_id in rows]
+
+
 def add_task(description: str) -> int:
     now = datetime.utcnow().isoformat(timespec="seconds")
-    with _lock, _get_connection() as conn:
+    with _db.writer() as conn:
         cursor = conn.execute(
             """
             INSERT INTO tasks(description, status, created_at, updated_at)
@@ -127,12 +506,20 @@ def add_task(description: str) -> int:
             (description.strip(), now, now),
         )
         task_id = int(cursor.lastrowid)
-        _prune_tasks(conn)
-        return task_id
+    _pending_tasks_cache.invalidate()
+    _note_inserted("tasks", MAX_TASKS)
+    return task_id
 
 
 def list_tasks(status: str = "pending", limit: int = 20) -> list[dict]:
-    with _lock, _get_connection() as conn:
+    if status == "pending":
+        tasks = _pending_tasks_cache.get(limit, lambda: _load_tasks(status, limit))
+        return [dict(task) for task in tasks]
+    return _load_tasks(status, limit)
+
+
+def _load_tasks(status: str, limit: int) -> list[dict]:
+    with _db.reader() as conn:
         rows = conn.execute(
             """
             SELECT id, description, status, created_at, updated_at
@@ -148,7 +535,7 @@ def list_tasks(status: str = "pending", limit: int = 20) -> list[dict]:
 
 def complete_task(task_id: int) -> bool:
     now = datetime.utcnow().isoformat(timespec="seconds")
-    with _lock, _get_connection() as conn:
+    with _db.writer() as conn:
         cursor = conn.execute(
             """
             UPDATE tasks
@@ -157,84 +544,303 @@ def complete_task(task_id: int) -> bool:
             """,
             (now, task_id),
         )
-        _prune_tasks(conn)
-        return cursor.rowcount > 0
+    _pending_tasks_cache.invalidate()
+    return cursor.rowcount > 0
 
 
-def _prune_notes(conn: sqlite3.Connection) -> None:
-    if MAX_NOTES <= 0:
+def export_records(tables: Iterable[str] = ("notes", "tasks")) -> Iterator[dict]:
+    """Stream notes and tasks as dicts tagged with a "type" key, oldest first.
+
+    Rows come straight off a reader cursor, so the table is never loaded whole.
+    """
+    queries = {
+        "notes": ("note", "SELECT content, created_at FROM notes ORDER BY id"),
+        "tasks": ("task", "SELECT description, status, created_at, updated_at FROM tasks ORDER BY id"),
+    }
+    with _db.reader() as conn:
+        for table in tables:
+            kind, sql = queries[table]
+            for row in conn.execute(sql):
+                yield {"type": kind, **dict(row)}
+
+
+def import_records(records: Iterable[dict]) -> dict:
+    """Insert exported records in one transaction, then apply retention once.
+
+    `records` may be any iterable (e.g. a generator over an NDJSON file); it is
+    consumed in IMPORT_CHUNK_ROWS chunks and fed to executemany. Records without
+    text or with an unknown type are skipped. Returns the per-type counts.
+    """
+    now = datetime.utcnow().isoformat(timespec="seconds")
+    counts = {"notes": 0, "tasks": 0, "skipped": 0}
+    records = iter(records)
+    with _db.writer() as conn:
+        conn.execute("BEGIN IMMEDIATE")
+        last_note_id = conn.execute("SELECT COALESCE(MAX(id), 0) FROM notes").fetchone()[0]
+        if _fts_enabled:
+            # Indexing the new rows with one INSERT ... SELECT is several times faster than
+            # the per-row trigger. The trigger is restored in the same transaction.
+            conn.execute("DROP TRIGGER IF EXISTS notes_fts_insert")
+        while chunk := list(itertools.islice(records, IMPORT_CHUNK_ROWS)):
+            notes, tasks = [], []
+            for record in chunk:
+                kind = record.get("type")
+                text = str(record.get("content" if kind == "note" else "description") or "").strip()
+                if kind == "note" and text:
+                    notes.append((text, record.get("created_at") or now))
+                elif kind == "task" and text:
+                    created = record.get("created_at") or now
+                    tasks.append((text, record.get("status") or "pending", created, record.get("updated_at") or created))
+                else:
+                    counts["skipped"] += 1
+            conn.executemany("INSERT INTO notes(content, created_at) VALUES (?, ?)", notes)
+            conn.executemany(
+                "INSERT INTO tasks(description, status, created_at, updated_at) VALUES (?, ?, ?, ?)",
+                tasks,
+            )
+            counts["notes"] += len(notes)
+            counts["tasks"] += len(tasks)
+        if _fts_enabled:
+            conn.execute(
+                "INSERT INTO notes_fts(rowid, content) SELECT id, content FROM notes WHERE id > ?",
+                (last_note_id,),
+            )
+            conn.execute(_NOTES_FTS_INSERT_TRIGGER)
+    if counts["tasks"]:
+        _pending_tasks_cache.invalidate()
+    _run_retention()
+    if counts["notes"]:
+        _embed_notes_after(last_note_id)
+    return counts
+
+
+def add_notes(contents: Iterable[str]) -> int:
+    return import_records({"type": "note", "content": content} for content in contents)["notes"]
+
+
+def add_tasks(descriptions: Iterable[str]) -> int:
+    return import_records({"type": "task", "description": text} for text in descriptions)["tasks"]
+
+
+def _embed_notes_after(note_id: int, batch_size: int = 1000) -> None:
+    """Embed bulk-inserted notes (ids above `note_id`) on a background thread."""
+    if _vectors is None:
+        return  # the startup loader's sync picks them up
+
+    def _run():
+        last = note_id
+        while True:
+            with _db.reader() as conn:
+                rows = conn.execute(
+                    "SELECT id, content FROM notes WHERE id > ? ORDER BY id LIMIT ?",
+                    (last, batch_size),
+                ).fetchall()
+            if not rows:
+                return
+            _vectors.add([(row["id"], row["content"]) for row in rows])
+            last = rows[-1]["id"]
+
+    threading.Thread(target=_run, name="semantic-memory-import", daemon=True).start()
+
+
+def _note_inserted(table: str, limit: int) -> None:
+    """Wake the retention job once `table` is PRUNE_SLACK_ROWS past its cap."""
+    if limit <= 0:
         return
-    conn.execute(
-        """
-        DELETE FROM notes
-        WHERE id NOT IN (
-            SELECT id FROM notes ORDER BY id DESC LIMIT ?
-        )
-        """,
-        (MAX_NOTES,),
-    )
+    with _row_estimates_lock:
+        _row_estimates[table] += 1
+        over = _row_estimates[table] > limit + PRUNE_SLACK_ROWS
+    if over:
+        _maintenance.request("retention")
+
+
+def _delete_in_batches(table: str, where: str, params: tuple):
+    """Delete matching rows oldest first, one short write transaction per batch.
+
+    Yields the ids deleted by each batch so derived indexes can follow along.
+    """
+    while True:
+        with _db.writer() as conn:
+            rows = conn.execute(
+                f"""
+                DELETE FROM {table}
+                WHERE id IN (SELECT id FROM {table} WHERE {where} ORDER BY id LIMIT ?)
+                RETURNING id
+                """,
+                (*params, PRUNE_BATCH_SIZE),
+            ).fetchall()
+        if rows:
+            yield [row[0] for row in rows]
+        if len(rows) < PRUNE_BATCH_SIZE:
+            return
+
+
+def _id_cutoff(table: str, keep: int) -> int | None:
+    """Newest id that falls outside the `keep` most recent rows, or None if there is none.
+
+    Ids only grow (AUTOINCREMENT), so `id <= cutoff` selects exactly the overflow
+    and the delete can walk the primary key instead of a NOT IN subquery.
+    """
+    with _db.reader() as conn:
+        row = conn.execute(
+            f"SELECT id FROM {table} ORDER BY id DESC LIMIT 1 OFFSET ?",
+            (keep,),
+        ).fetchone()
+    return None if row is None else int(row[0])
 
 
-def _prune_tasks(conn: sqlite3.Connection) -> None:
+def _prune_notes() -> int:
+    if MAX_NOTES <= 0:
+        return 0
+    cutoff = _id_cutoff("notes", MAX_NOTES)
+    if cutoff is None:
+        return 0
+    deleted = 0
+    for ids in _delete_in_batches("notes", "id <= ?", (cutoff,)):
+        if _vectors is not None:
+            _vectors.remove(ids)
+        deleted += len(ids)
+    return deleted
+
+
+def _prune_tasks() -> int:
+    deleted = 0
     if DONE_TASK_RETENTION_DAYS >= 0:
         cutoff = (datetime.utcnow() - timedelta(days=DONE_TASK_RETENTION_DAYS)).isoformat(
             timespec="seconds"
         )
-        conn.execute(
-            """
-            DELETE FROM tasks
-            WHERE status = 'done' AND updated_at < ?
-            """,
-            (cutoff,),
-        )
+        for ids in _delete_in_batches("tasks", "status = 'done' AND updated_at < ?", (cutoff,)):
+            deleted += len(ids)
 
     if MAX_TASKS <= 0:
-        return
-
-    conn.execute(
-        """
-        DELETE FROM tasks
-        WHERE id NOT IN (
-            SELECT id FROM tasks ORDER BY id DESC LIMIT ?
-        )
-        """,
-        (MAX_TASKS,),
-    )
+        return deleted
+
+    id_cutoff = _id_cutoff("tasks", MAX_TASKS)
+    if id_cutoff is not None:
+        for ids in _delete_in_batches("tasks", "id <= ?", (id_cutoff,)):
+            deleted += len(ids)
+        _pending_tasks_cache.invalidate()
+    return deleted
+
+
+def _run_retention() -> None:
+    _prune_notes()
+    _prune_tasks()
+    with _db.reader() as conn:
+        counters = _read_counters(conn)
+    with _row_estimates_lock:
+        _row_estimates.update({table: counters[table] for table in _row_estimates})
+
+
+def compact_memory() -> bool:
+    """Switch a database created without auto_vacuum to incremental vacuum.
+
+    This needs one full VACUUM, which holds the writer for its whole run, so it is
+    only done on request (`python -m app.cli compact`), never by the background job.
+    Returns False if the database already uses incremental vacuum.
+    """
+    with _db.raw_writer() as conn:
+        if conn.execute("PRAGMA auto_vacuum").fetchone()[0] == 2:
+            return False
+        conn.execute("PRAGMA auto_vacuum = INCREMENTAL")
+        conn.execute("VACUUM")
+    return True
+
+
+def _incremental_vacuum(budget_ms: float = VACUUM_BUDGET_MS) -> int:
+    """Release free pages in small steps until none are left or the time budget runs out.
+
+    The writer is held for one step at a time, so other writes interleave.
+    Returns the number of pages released.
+    """
+    deadline = time.monotonic() + budget_ms / 1000
+    released = 0
+    while time.monotonic() < deadline:
+        with _db.raw_writer() as conn:
+            before = conn.execute("PRAGMA freelist_count").fetchone()[0]
+            if before == 0:
+                break
+            # executescript steps the pragma to completion; execute() frees a single page.
+            conn.executescript(f"PRAGMA incremental_vacuum({VACUUM_STEP_PAGES});")
+            released += before - conn.execute("PRAGMA freelist_count").fetchone()[0]
+    return released
+
+
+def _run_vacuum() -> None:
+    # Without incremental auto_vacuum (older DBs until `compact`) this releases nothing.
+    _incremental_vacuum()
+    with _db.raw_writer() as conn:
+        conn.execute("PRAGMA wal_checkpoint(PASSIVE)").fetchall()
 
 
 def cleanup_memory() -> None:
-    with _lock, _get_connection() as conn:
-        _prune_notes(conn)
-        _prune_tasks(conn)
-    with _lock:
-        vacuum_conn = sqlite3.connect(DB_PATH, isolation_level=None)
-        try:
-            vacuum_conn.execute("VACUUM")
-        finally:
-            vacuum_conn.close()
+    """Apply retention now; freed pages are released by the background vacuum job."""
+    _run_retention()
+    _maintenance.request("vacuum")
+
+
+def backup_memory(dest: Path | str | None = None) -> Path:
+    """Copy a consistent snapshot of the memory DB with SQLite's online backup API.
+
+    The copy reads from a pooled reader connection, so writers keep going (WAL).
+    """
+    if dest is None:
+        dest = BACKUP_DIR / f"{DB_PATH.stem}-{datetime.now():%Y%m%d-%H%M%S}.db"
+    dest = Path(dest)
+    dest.parent.mkdir(parents=True, exist_ok=True)
+    target = sqlite3.connect(dest)
+    try:
+        with _db.reader() as conn:
+            conn.backup(target)
+    finally:
+        target.close()
+    return dest
+
+
+def _file_size(path: Path) -> int:
+    try:
+        return path.stat().st_size
+    except OSError:
+        return 0
 
 
 def get_memory_stats() -> dict:
-    with _lock, _get_connection() as conn:
-        notes_count = conn.execute("SELECT COUNT(*) FROM notes").fetchone()[0]
-        tasks_count = conn.execute("SELECT COUNT(*) FROM tasks").fetchone()[0]
-        done_tasks_count = conn.execute(
-            "SELECT COUNT(*) FROM tasks WHERE status = 'done'"
-        ).fetchone()[0]
+    with _db.reader() as conn:
+        counters = _read_counters(conn)
+        page_size = conn.execute("PRAGMA page_size").fetchone()[0]
+        page_count = conn.execute("PRAGMA page_count").fetchone()[0]
+        freelist_count = conn.execute("PRAGMA freelist_count").fetchone()[0]
+        auto_vacuum = conn.execute("PRAGMA auto_vacuum").fetchone()[0]
     return {
         "db_path": str(DB_PATH),
-        "notes_count": int(notes_count),
-        "tasks_count": int(tasks_count),
-        "done_tasks_count": int(done_tasks_count),
+        "notes_count": counters["notes"],
+        "tasks_count": counters["tasks"],
+        "done_tasks_count": counters["done_tasks"],
+        "table_rows": {name: counters[name] for name in ("profile", "notes", "tasks")},
+        "db_size_bytes": _file_size(_db.path),
+        "wal_size_bytes": _file_size(_db.path.with_name(_db.path.name + "-wal")),
+        "page_size": int(page_size),
+        "page_count": int(page_count),
+        "freelist_count": int(freelist_count),
+        "auto_vacuum": {0: "none", 1: "full", 2: "incremental"}.get(auto_vacuum, str(auto_vacuum)),
         "max_notes": MAX_NOTES,
         "max_tasks": MAX_TASKS,
         "done_task_retention_days": DONE_TASK_RETENTION_DAYS,
+        "profile_cache": _profile_cache.stats(),
+        "pending_tasks_cache": _pending_tasks_cache.stats(),
     }
 
 
 def get_relevant_memory(query: str) -> str:
     query_l = (query or "").lower()
     notes = search_notes(query, limit=3)
+    seen = {note["id"] for note in notes}
+    for note in semantic_search_notes(query, limit=3):
+        if len(notes) >= 5:
+            break
+        if note["id"] not in seen:
+            notes.append(note)
+            seen.add(note["id"])
     name = get_profile("name")
     task_keywords = {
         "task",
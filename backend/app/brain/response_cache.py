@@ -0,0 +1,166 @@
+import hashlib
+import os
+import re
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+
+from app.brain.llm_engine import ERROR_MESSAGES, OLLAMA_MODEL
+from app.brain.memory import delete_cached_responses, load_cached_responses, save_cached_response
+
+# Opt-in: answers can go stale, so caching is off unless enabled.
+RESPONSE_CACHE_ENABLED = os.getenv("ASSISTANT_RESPONSE_CACHE", "0") == "1"
+RESPONSE_CACHE_TTL_SECONDS = float(os.getenv("ASSISTANT_RESPONSE_CACHE_TTL_SECONDS", "86400"))
+RESPONSE_CACHE_SIZE = int(os.getenv("ASSISTANT_RESPONSE_CACHE_SIZE", "500"))
+
+_CONTRACTIONS = {
+    "what's": "what is",
+    "who's": "who is",
+    "where's": "where is",
+    "how's": "how is",
+    "it's": "it is",
+    "that's": "that is",
+    "i'm": "i am",
+    "you're": "you are",
+    "can't": "can not",
+    "don't": "do not",
+    "doesn't": "does not",
+}
+# With earlier turns in the conversation, these make a question depend on them ("why is that?").
+_REFERRING_WORDS = {
+    "it", "its", "that", "this", "those", "these", "they", "them", "their", "he", "him", "his",
+    "she", "her", "there", "again", "also", "more", "else", "another", "previous", "last", "above",
+}
+_FOLLOW_UP_STARTS = ("and ", "but ", "so ", "or ", "what about ", "how about ", "then ")
+# Answers to these change over time no matter the history.
+_VOLATILE_WORDS = {
+    "now", "today", "tonight", "tomorrow", "yesterday", "latest", "current", "currently", "time",
+    "date", "weather", "news", "recent", "random",
+}
+
+
+def normalize_question(text: str) -> str:
+    text = unicodedata.normalize("NFKC", text or "").lower().replace("’", "'")
+    words = [_CONTRACTIONS.get(word, word) for word in text.split()]
+    text = re.sub(r"[^\w\s]", " ", " ".join(words))
+    return " ".join(text.split())
+
+
+class ResponseCache:
+    """LRU + TTL cache of LLM answers keyed on the normalized question and memory context.
+
+    Entries are persisted in the memory DB so they survive restarts. Questions that
+    lean on earlier turns, or whose answer changes over time, bypass the cache.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = RESPONSE_CACHE_SIZE,
+        ttl_seconds: float = RESPONSE_CACHE_TTL_SECONDS,
+        model: str = OLLAMA_MODEL,
+        persist: bool = True,
+    ):
+        self.max_entries = max(1, max_entries)
+        self.ttl_seconds = ttl_seconds
+        self.model = model
+        self.persist = persist
+        self._entries: OrderedDict[str, tuple[str, float]] = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "misses": 0, "bypassed": 0, "stores": 0, "evictions": 0, "expired": 0}
+        if persist:
+            for key, response, created_at in load_cached_responses(self.max_entries):
+                self._entries[key] = (response, created_at)
+
+    def _key(self, question: str, memory_context: str) -> str:
+        context_hash = hashlib.sha1((memory_context or "").encode("utf-8")).hexdigest()
+        raw = f"{self.model}\x00{question}\x00{context_hash}"
+        return hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
+    def _bypass_reason(self, question: str, conversation_history: list[dict] | None) -> str | None:
+        words = set(question.split())
+        if not words:
+            return "empty"
+        if words & _VOLATILE_WORDS:
+            return "time-sensitive"
+        if conversation_history and (words & _REFERRING_WORDS or question.startswith(_FOLLOW_UP_STARTS)):
+            return "context-dependent"
+        return None
+
+    def lookup(self, user_text: str, memory_context: str, conversation_history: list[dict] | None = None) -> str | None:
+        """Cached answer for this question, or None (miss, expired or bypassed)."""
+        question = normalize_question(user_text)
+        if self._bypass_reason(question, conversation_history):
+            with self._lock:
+                self._stats["bypassed"] += 1
+            return None
+        key = self._key(question, memory_context)
+        expired = False
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and time.time() - entry[1] > self.ttl_seconds:
+                del self._entries[key]
+                self._stats["expired"] += 1
+                entry, expired = None, True
+            if entry is None:
+                self._stats["misses"] += 1
+            else:
+                self._entries.move_to_end(key)
+                self._stats["hits"] += 1
+        if expired and self.persist:
+            delete_cached_responses([key])
+        return entry[0] if entry is not None else None
+
+    def store(
+        self,
+        user_text: str,
+        memory_context: str,
+        response: str,
+        conversation_history: list[dict] | None = None,
+    ) -> None:
+        response = (response or "").strip()
+        question = normalize_question(user_text)
+        if not response or response in ERROR_MESSAGES or self._bypass_reason(question, conversation_history):
+            return
+        key = self._key(question, memory_context)
+        created_at = time.time()
+        with self._lock:
+            self._entries[key] = (response, created_at)
+            self._entries.move_to_end(key)
+            evicted = []
+            while len(self._entries) > self.max_entries:
+                evicted.append(self._entries.popitem(last=False)[0])
+            self._stats["stores"] += 1
+            self._stats["evictions"] += len(evicted)
+        if self.persist:
+            save_cached_response(key, response, created_at)
+            if evicted:
+                delete_cached_responses(evicted)
+
+    def stats(self) -> dict:
+        with self._lock:
+            stats = dict(self._stats)
+            stats["entries"] = len(self._entries)
+        lookups = stats["hits"] + stats["misses"]
+        stats["hit_rate"] = stats["hits"] / lookups if lookups else 0.0
+        return stats
+
+
+_cache: ResponseCache | None = None
+_cache_lock = threading.Lock()
+
+
+def get_response_cache() -> ResponseCache | None:
+    """The shared cache, or None when ASSISTANT_RESPONSE_CACHE is off."""
+    global _cache
+    if not RESPONSE_CACHE_ENABLED:
+        return None
+    with _cache_lock:
+        if _cache is None:
+            _cache = ResponseCache()
+        return _cache
+
+
+def get_response_cache_stats() -> dict:
+    cache = get_response_cache()
+    return {"enabled": False} if cache is None else {"enabled": True, **cache.stats()}
@@ -0,0 +1,94 @@
+import threading
+from collections.abc import Callable, Iterator
+
+# How often a waiting subscriber checks its own cancel event.
+_POLL_SECONDS = 0.05
+
+
+class _Flight:
+    def __init__(self):
+        self.tokens: list[str] = []
+        self.done = False
+        self.subscribers = 0
+        self.cancel_event = threading.Event()
+        self.cond = threading.Condition()
+
+
+class SingleFlight:
+    """Coalesces concurrent identical token streams onto one producer.
+
+    The first caller for a key starts `produce(cancel_event)` on a worker thread; callers
+    arriving with the same key while it runs replay the tokens produced so far and then
+    follow it live. Each subscriber can leave via its own cancel event; the producer is
+    cancelled only once every subscriber has left. Finished flights are forgotten, so a
+    later identical request starts a fresh generation.
+    """
+
+    def __init__(self):
+        self._flights: dict[str, _Flight] = {}
+        self._lock = threading.Lock()
+        self._stats = {"started": 0, "coalesced": 0, "abandoned": 0}
+
+    def stream(
+        self,
+        key: str,
+        produce: Callable[[threading.Event], Iterator[str]],
+        cancel_event: threading.Event | None = None,
+    ) -> Iterator[str]:
+        cancel_event = cancel_event or threading.Event()
+        with self._lock:
+            flight = self._flights.get(key)
+            if flight is None:
+                flight = self._flights[key] = _Flight()
+                self._stats["started"] += 1
+                threading.Thread(
+                    target=self._produce, args=(key, flight, produce), name="llm-single-flight", daemon=True
+                ).start()
+            else:
+                self._stats["coalesced"] += 1
+            flight.subscribers += 1
+        try:
+            position = 0
+            while True:
+                with flight.cond:
+                    while position == len(flight.tokens) and not flight.done and not cancel_event.is_set():
+                        flight.cond.wait(_POLL_SECONDS)
+                    if cancel_event.is_set():
+                        return
+                    pending = flight.tokens[position:]
+                    done = flight.done
+                position += len(pending)
+                yield from pending
+                if done and position == len(flight.tokens):
+                    return
+        finally:
+            self._leave(key, flight)
+
+    def _produce(self, key: str, flight: _Flight, produce: Callable[[threading.Event], Iterator[str]]) -> None:
+        try:
+            for token in produce(flight.cancel_event):
+                with flight.cond:
+                    flight.tokens.append(token)
+                    flight.cond.notify_all()
+        finally:
+            with self._lock:
+                if self._flights.get(key) is flight:
+                    del self._flights[key]
+            with flight.cond:
+                flight.done = True
+                flight.cond.notify_all()
+
+    def _leave(self, key: str, flight: _Flight) -> None:
+        with self._lock:
+            flight.subscribers -= 1
+            if flight.subscribers or flight.done:
+                return
+            # Nobody is listening any more: stop generating and let the next caller start afresh.
+            if self._flights.get(key) is flight:
+                del self._flights[key]
+            self._stats["abandoned"] += 1
+        flight.cancel_event.set()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {**self._stats, "in_flight": len(self._flights)}
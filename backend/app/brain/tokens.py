@@ -0,0 +1,60 @@
+import math
+import os
+import threading
+
+# Path to a tokenizer.json (or a Hugging Face model id) matching OLLAMA_MODEL. Needs the
+# optional `tokenizers` package; without it counts use a fast character-based estimate.
+TOKENIZER = os.getenv("ASSISTANT_TOKENIZER", "").strip()
+CHARS_PER_TOKEN = 4.0
+
+_tokenizer = None
+_tokenizer_error: str | None = None
+_tokenizer_lock = threading.Lock()
+
+
+def _get_tokenizer():
+    global _tokenizer, _tokenizer_error
+    if not TOKENIZER or _tokenizer_error is not None:
+        return None
+    with _tokenizer_lock:
+        if _tokenizer is None and _tokenizer_error is None:
+            try:
+                from tokenizers import Tokenizer
+
+                if os.path.exists(TOKENIZER):
+                    _tokenizer = Tokenizer.from_file(TOKENIZER)
+                else:
+                    _tokenizer = Tokenizer.from_pretrained(TOKENIZER)
+            except Exception as e:
+                _tokenizer_error = str(e)
+                print(f"Tokenizer '{TOKENIZER}' unavailable ({e}); using approximate token counts.")
+        return _tokenizer
+
+
+def tokenizer_name() -> str:
+    return TOKENIZER if _get_tokenizer() is not None else "approximate"
+
+
+def count_tokens(text: str) -> int:
+    if not text:
+        return 0
+    tokenizer = _get_tokenizer()
+    if tokenizer is not None:
+        return len(tokenizer.encode(text, add_special_tokens=False).ids)
+    return math.ceil(len(text) / CHARS_PER_TOKEN)
+
+
+def truncate_tokens(text: str, max_tokens: int, marker: str = " […]") -> str:
+    """Cut `text` to at most `max_tokens` tokens (marker included), keeping the start."""
+    if count_tokens(text) <= max_tokens:
+        return text
+    budget = max_tokens - count_tokens(marker)
+    if budget <= 0:
+        return ""
+    tokenizer = _get_tokenizer()
+    if tokenizer is not None:
+        offsets = tokenizer.encode(text, add_special_tokens=False).offsets
+        cut = offsets[budget - 1][1]
+    else:
+        cut = int(budget * CHARS_PER_TOKEN)
+    return text[:cut].rstrip() + marker
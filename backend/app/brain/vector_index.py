@@ -0,0 +1,222 @@
+import json
+import os
+import re
+import threading
+import zlib
+from pathlib import Path
+
+import numpy as np
+
+EMBEDDING_MODEL = os.getenv("ASSISTANT_EMBEDDING_MODEL", "all-MiniLM-L6-v2").strip()
+HASHING_DIM = 256
+QUERY_CHUNK_ROWS = 65536
+COMPACT_RATIO = 0.25
+
+
+class HashingEmbedder:
+    """Deterministic stand-in embedder: signed feature hashing of words and character trigrams.
+
+    Needs no model download, gives identical vectors across runs and machines, and is
+    what tests and machines without `sentence-transformers` use.
+    """
+
+    name = "hashing"
+
+    def __init__(self, dim: int = HASHING_DIM):
+        self.dim = dim
+
+    def _features(self, text: str) -> list[str]:
+        words = re.findall(r"\w+", text.lower())
+        grams = [f"#{w[i:i + 3]}" for w in words for i in range(max(1, len(w) - 2))]
+        return words + grams
+
+    def embed(self, texts: list[str]) -> np.ndarray:
+        matrix = np.zeros((len(texts), self.dim), dtype=np.float32)
+        for row, text in enumerate(texts):
+            for feature in self._features(text):
+                digest = zlib.crc32(feature.encode("utf-8"))
+                sign = 1.0 if digest & 0x80000000 else -1.0
+                matrix[row, digest % self.dim] += sign
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        return matrix / np.maximum(norms, 1e-12)
+
+
+class SentenceTransformerEmbedder:
+    """Local CPU embedding model via `sentence-transformers` (optional dependency)."""
+
+    def __init__(self, model_name: str = EMBEDDING_MODEL):
+        from sentence_transformers import SentenceTransformer
+
+        self.name = model_name
+        self._model = SentenceTransformer(model_name, device="cpu")
+        self.dim = int(self._model.get_sentence_embedding_dimension())
+
+    def embed(self, texts: list[str]) -> np.ndarray:
+        vectors = self._model.encode(texts, normalize_embeddings=True, convert_to_numpy=True)
+        return np.asarray(vectors, dtype=np.float32)
+
+
+def load_embedder(model_name: str = EMBEDDING_MODEL):
+    if not model_name or model_name == "hashing":
+        return HashingEmbedder()
+    try:
+        return SentenceTransformerEmbedder(model_name)
+    except Exception as e:
+        print(f"Embedding model '{model_name}' unavailable ({e}); using hashing embedder.")
+        return HashingEmbedder()
+
+
+class VectorIndex:
+    """Note embeddings in a memory-mapped float16 matrix next to the SQLite DB.
+
+    Rows are appended as notes are added; removed notes become tombstones (id -1)
+    that queries skip, and the files are compacted once tombstones pile up. Files:
+    `<prefix>.vec` (count x dim float16), `<prefix>.ids` (int64) and `<prefix>.json`.
+    """
+
+    def __init__(self, prefix: Path, embedder=None, initial_capacity: int = 1024):
+        self.prefix = Path(prefix)
+        self.embedder = embedder or load_embedder()
+        self.dim = self.embedder.dim
+        self._lock = threading.RLock()
+        self._row_of: dict[int, int] = {}
+        self._count = 0
+        self._tombstones = 0
+        self._load(initial_capacity)
+
+    @property
+    def _meta_path(self) -> Path:
+        return self.prefix.with_suffix(".json")
+
+    def _open(self, capacity: int, mode: str) -> None:
+        self._capacity = capacity
+        self._vectors = np.memmap(
+            self.prefix.with_suffix(".vec"), dtype=np.float16, mode=mode, shape=(capacity, self.dim)
+        )
+        self._ids = np.memmap(self.prefix.with_suffix(".ids"), dtype=np.int64, mode=mode, shape=(capacity,))
+
+    def _load(self, initial_capacity: int) -> None:
+        self.prefix.parent.mkdir(parents=True, exist_ok=True)
+        meta = {}
+        if self._meta_path.exists():
+            try:
+                meta = json.loads(self._meta_path.read_text(encoding="utf-8"))
+            except ValueError:
+                meta = {}
+        compatible = meta.get("dim") == self.dim and meta.get("model") == self.embedder.name
+        if compatible and self.prefix.with_suffix(".vec").exists():
+            self._open(int(meta["capacity"]), "r+")
+            self._count = int(meta["count"])
+            for row, note_id in enumerate(self._ids[: self._count].tolist()):
+                if note_id >= 0:
+                    self._row_of[note_id] = row
+                else:
+                    self._tombstones += 1
+        else:
+            # New index, or the embedding model changed: start over (sync re-embeds).
+            self._open(initial_capacity, "w+")
+            self._count = 0
+            self._save_meta()
+
+    def _save_meta(self) -> None:
+        meta = {
+            "model": self.embedder.name,
+            "dim": self.dim,
+            "capacity": self._capacity,
+            "count": self._count,
+        }
+        self._meta_path.write_text(json.dumps(meta), encoding="utf-8")
+
+    def _grow(self, needed: int) -> None:
+        capacity = self._capacity
+        while capacity < needed:
+            capacity *= 2
+        self._vectors.flush()
+        self._ids.flush()
+        del self._vectors, self._ids
+        for suffix, itemsize in ((".vec", 2 * self.dim), (".ids", 8)):
+            with open(self.prefix.with_suffix(suffix), "r+b") as handle:
+                handle.truncate(capacity * itemsize)
+        self._open(capacity, "r+")
+
+    def __len__(self) -> int:
+        return len(self._row_of)
+
+    def ids(self) -> set[int]:
+        with self._lock:
+            return set(self._row_of)
+
+    def add(self, items: list[tuple[int, str]]) -> None:
+        """Embed and append (note_id, text) pairs; existing ids are replaced."""
+        if not items:
+            return
+        vectors = self.embedder.embed([text for _, text in items]).astype(np.float16)
+        with self._lock:
+            self._remove_locked([note_id for note_id, _ in items if note_id in self._row_of])
+            if self._count + len(items) > self._capacity:
+                self._grow(self._count + len(items))
+            start = self._count
+            self._vectors[start : start + len(items)] = vectors
+            self._ids[start : start + len(items)] = [note_id for note_id, _ in items]
+            for offset, (note_id, _) in enumerate(items):
+                self._row_of[note_id] = start + offset
+            self._count += len(items)
+            self._vectors.flush()
+            self._ids.flush()
+            self._save_meta()
+
+    def remove(self, note_ids) -> None:
+        with self._lock:
+            if self._remove_locked(note_ids):
+                self._ids.flush()
+                if self._tombstones > COMPACT_RATIO * max(self._count, 1):
+                    self._compact()
+
+    def _remove_locked(self, note_ids) -> int:
+        removed = 0
+        for note_id in note_ids:
+            row = self._row_of.pop(int(note_id), None)
+            if row is not None:
+                self._ids[row] = -1
+                self._vectors[row] = 0
+                removed += 1
+        self._tombstones += removed
+        return removed
+
+    def _compact(self) -> None:
+        live = np.flatnonzero(self._ids[: self._count] >= 0)
+        self._vectors[: live.size] = self._vectors[live]
+        self._ids[: live.size] = self._ids[live]
+        self._ids[live.size : self._count] = -1
+        self._count = int(live.size)
+        self._tombstones = 0
+        self._row_of = {int(note_id): row for row, note_id in enumerate(self._ids[: self._count].tolist())}
+        self._vectors.flush()
+        self._ids.flush()
+        self._save_meta()
+
+    def search(self, text: str, limit: int = 5, min_score: float = 0.0) -> list[tuple[int, float]]:
+        """Top-k (note_id, cosine similarity) for `text`, best first."""
+        query = self.embedder.embed([text])[0].astype(np.float32)
+        with self._lock:
+            if not self._row_of:
+                return []
+            scores = np.empty(self._count, dtype=np.float32)
+            for start in range(0, self._count, QUERY_CHUNK_ROWS):
+                end = min(start + QUERY_CHUNK_ROWS, self._count)
+                scores[start:end] = self._vectors[start:end].astype(np.float32) @ query
+            ids = np.array(self._ids[: self._count])
+        scores[ids < 0] = -np.inf
+        k = min(limit, len(scores))
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+        return [(int(ids[row]), float(scores[row])) for row in top if scores[row] >= min_score]
+
+    def sync(self, notes: list[tuple[int, str]], batch_size: int = 256) -> None:
+        """Make the index match the notes table: embed missing notes, drop deleted ones."""
+        wanted = {note_id for note_id, _ in notes}
+        self.remove(self.ids() - wanted)
+        indexed = self.ids()
+        missing = [(note_id, text) for note_id, text in notes if note_id not in indexed]
+        for start in range(0, len(missing), batch_size):
+            self.add(missing[start : start + batch_size])
@@ -1,9 +1,13 @@
-from app.brain.ai_engine import process_input
+import argparse
+import json
+import sys
 
 EXIT_WORDS = {"exit", "quit", "stop", "bye"}
 
 
 def run_cli() -> None:
+    from app.brain.ai_engine import process_input
+
     print("Jarvis CLI (offline). Type 'exit' to stop.")
     while True:
         try:
@@ -23,5 +27,93 @@ def run_cli() -> None:
         print(f"Assistant: {response}")
 
 
+def export_memory(path: str, tables: list[str]) -> int:
+    """Write notes/tasks as NDJSON (one record per line) to `path` or stdout ("-")."""
+    from app.brain.memory import export_records
+
+    out = sys.stdout if path == "-" else open(path, "w", encoding="utf-8")
+    count = 0
+    try:
+        for record in export_records(tables):
+            out.write(json.dumps(record, ensure_ascii=False) + "\n")
+            count += 1
+    finally:
+        if out is not sys.stdout:
+            out.close()
+    return count
+
+
+def _read_ndjson(handle):
+    for line_no, line in enumerate(handle, start=1):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            record = json.loads(line)
+        except ValueError as e:
+            raise ValueError(f"line {line_no}: {e}") from None
+        if not isinstance(record, dict):
+            raise ValueError(f"line {line_no}: expected a JSON object")
+        yield record
+
+
+def import_memory(path: str) -> dict:
+    """Load an NDJSON export from `path` or stdin ("-") in one transaction."""
+    from app.brain.memory import import_records
+
+    handle = sys.stdin if path == "-" else open(path, encoding="utf-8")
+    try:
+        return import_records(_read_ndjson(handle))
+    finally:
+        if handle is not sys.stdin:
+            handle.close()
+
+
+def compact_memory() -> bool:
+    from app.brain.memory import compact_memory as _compact
+
+    return _compact()
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(prog="python -m app.cli", description="Jarvis offline CLI.")
+    commands = parser.add_subparsers(dest="command")
+    commands.add_parser("chat", help="interactive chat (default)")
+    export_parser = commands.add_parser("export", help="dump notes and tasks as NDJSON")
+    export_parser.add_argument("path", nargs="?", default="-", help="output file (default: stdout)")
+    export_parser.add_argument(
+        "--table", choices=["notes", "tasks"], action="append", help="limit to one table (repeatable)"
+    )
+    import_parser = commands.add_parser("import", help="load notes and tasks from NDJSON")
+    import_parser.add_argument("path", nargs="?", default="-", help="input file (default: stdin)")
+    commands.add_parser(
+        "compact", help="one-time full VACUUM enabling incremental vacuum (run with the assistant stopped)"
+    )
+    args = parser.parse_args(argv)
+
+    if args.command == "export":
+        count = export_memory(args.path, args.table or ["notes", "tasks"])
+        print(f"Exported {count} records.", file=sys.stderr)
+    elif args.command == "import":
+        try:
+            counts = import_memory(args.path)
+        except ValueError as e:
+            # The whole import is one transaction, so nothing was written.
+            parser.exit(1, f"Import failed: {e}\n")
+        print(
+            f"Imported {counts['notes']} notes and {counts['tasks']} tasks"
+            f" ({counts['skipped']} skipped).",
+            file=sys.stderr,
+        )
+    elif args.command == "compact":
+        print("Compacting memory DB (full VACUUM)...", file=sys.stderr)
+        if compact_memory():
+            print("Memory DB now uses incremental vacuum.", file=sys.stderr)
+        else:
+            print("Memory DB already uses incremental vacuum; nothing to do.", file=sys.stderr)
+    else:
+        run_cli()
+
+
 if __name__ == "__main__":
-    run_cli()
+    main()
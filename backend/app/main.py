@@ -1,9 +1,18 @@
 from fastapi import FastAPI, WebSocket, WebSocketDisconnect
 from fastapi.middleware.cors import CORSMiddleware
 import asyncio
-from app.voice.voice_controller import assistant
+import os
+from app.brain.llm_engine import get_llm_stats
 from app.event_bus import bus
 
+# Text-only mode never imports the audio stack (sounddevice, faster-whisper, pyttsx3).
+TEXT_ONLY = os.getenv("ASSISTANT_TEXT_ONLY", "0") == "1"
+
+if TEXT_ONLY:
+    from app.assistant import assistant
+else:
+    from app.voice.voice_controller import assistant
+
 app = FastAPI(title="Personal AI Assistant")
 
 # Enable CORS for Desktop/Web apps
@@ -39,14 +48,40 @@ def shutdown_event():
 def root():
     return {"status": "Personal AI Assistant is running 🚀"}
 
+@app.get("/health")
+def health():
+    stt = None
+    if assistant.voice_enabled:
+        from app.voice.speech_to_text import get_model_status
+
+        stt = get_model_status()
+    return {
+        "status": "ok",
+        "mode": "voice" if assistant.voice_enabled else "text",
+        "running": assistant.running,
+        "stt": stt,
+        "ready": stt is None or stt["ready"],
+        "llm": get_llm_stats(),
+    }
+
+@app.get("/memory/stats")
+async def memory_stats():
+    from app.brain import async_memory
+
+    return await async_memory.get_memory_stats()
+
 @app.websocket("/ws")
 async def websocket_endpoint(websocket: WebSocket):
     await websocket.accept()
     
+    # Serialize sends so streamed ai_response_delta tokens arrive in order
+    send_lock = asyncio.Lock()
+
     # Subscribe this socket to the event bus
     async def send_message(payload):
         try:
-            await websocket.send_json(payload)
+            async with send_lock:
+                await websocket.send_json(payload)
         except:
             pass # Handle disconnects gracefully
             
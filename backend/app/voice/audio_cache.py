@@ -0,0 +1,253 @@
+import hashlib
+import os
+import re
+import threading
+import wave
+from collections import OrderedDict
+from pathlib import Path
+
+import numpy as np
+
+_backend_dir = Path(__file__).resolve().parents[2]
+AUDIO_CACHE_DIR = Path(os.getenv("TTS_AUDIO_CACHE_DIR", str(_backend_dir / "tts_cache")))
+AUDIO_CACHE_MAX_DYNAMIC = int(os.getenv("TTS_AUDIO_CACHE_MAX_DYNAMIC", "64"))
+AUDIO_CACHE_MAX_CHARS = int(os.getenv("TTS_AUDIO_CACHE_MAX_CHARS", "80"))
+# A phrase is rendered only after this many misses; one-off LLM sentences never repeat.
+AUDIO_CACHE_MIN_REPEATS = int(os.getenv("TTS_AUDIO_CACHE_MIN_REPEATS", "2"))
+FRAGMENT_GAP_SECONDS = 0.06
+SILENCE_LEVEL = 300
+
+_ONES = [
+    "zero", "one", "two", "three", "four", "five", "six", "seven", "eight", "nine",
+    "ten", "eleven", "twelve", "thirteen", "fourteen", "fifteen", "sixteen",
+    "seventeen", "eighteen", "nineteen",
+]
+_TENS = ["", "", "twenty", "thirty", "forty", "fifty", "sixty", "seventy", "eighty", "ninety"]
+NUMBER_FRAGMENTS = _ONES + _TENS[2:] + ["hundred", "thousand"]
+
+
+def number_words(value: int) -> list[str]:
+    """Spell 0..999999 as a list of words, each of which is a cacheable fragment."""
+    if value < 20:
+        return [_ONES[value]]
+    if value < 100:
+        tens, ones = divmod(value, 10)
+        return [_TENS[tens]] + ([_ONES[ones]] if ones else [])
+    if value < 1000:
+        hundreds, rest = divmod(value, 100)
+        return [_ONES[hundreds], "hundred"] + (number_words(rest) if rest else [])
+    thousands, rest = divmod(value, 1000)
+    return number_words(thousands) + ["thousand"] + (number_words(rest) if rest else [])
+
+
+def _numbered(prefix: str, suffix: str = ""):
+    def fragments(match: re.Match) -> list[str] | None:
+        value = int(match.group(1))
+        if value >= 1_000_000:
+            return None
+        return [prefix, *number_words(value)] + ([suffix] if suffix else [])
+
+    return fragments
+
+
+# Templated confirmations assembled from cached fragments instead of rendered per id.
+# Patterns match single sentences, as produced by the speech pipeline.
+TEMPLATES = [
+    (re.compile(r"^Task added as #(\d+)\.$"), _numbered("Task added as number")),
+    (re.compile(r"^Note #(\d+)\.$"), _numbered("Note number")),
+    (re.compile(r"^Task #(\d+) marked as done\.$"), _numbered("Task number", "marked as done.")),
+]
+TEMPLATE_FRAGMENTS = ["Task added as number", "Saved.", "Note number", "Task number", "marked as done."]
+
+
+def _trim_silence(pcm: np.ndarray) -> np.ndarray:
+    loud = np.flatnonzero(np.abs(pcm) > SILENCE_LEVEL)
+    if loud.size == 0:
+        return pcm[:0]
+    return pcm[loud[0] : loud[-1] + 1]
+
+
+def _read_wav(path: Path) -> tuple[np.ndarray, int] | None:
+    try:
+        with wave.open(str(path), "rb") as wav:
+            if wav.getsampwidth() != 2:
+                return None
+            channels = wav.getnchannels()
+            sample_rate = wav.getframerate()
+            frames = wav.readframes(wav.getnframes())
+    except (OSError, EOFError, wave.Error):
+        return None
+    pcm = np.frombuffer(frames, dtype=np.int16)
+    if channels > 1:
+        pcm = pcm.reshape(-1, channels)[:, 0].copy()
+    return pcm, sample_rate
+
+
+class AudioCache:
+    """Pre-rendered PCM for phrases the assistant says over and over.
+
+    Entries are WAV files under `cache_dir`, keyed by a hash of text + voice + rate, and
+    are kept in memory once loaded. Pinned phrases (canned replies and template
+    fragments) never expire; other short phrases are cached once they have been
+    spoken `min_repeats` times and evicted least-recently-used beyond `max_dynamic`.
+    """
+
+    def __init__(
+        self,
+        cache_dir: Path = AUDIO_CACHE_DIR,
+        max_dynamic: int = AUDIO_CACHE_MAX_DYNAMIC,
+        max_chars: int = AUDIO_CACHE_MAX_CHARS,
+        min_repeats: int = AUDIO_CACHE_MIN_REPEATS,
+    ):
+        self.cache_dir = Path(cache_dir)
+        self.max_dynamic = max_dynamic
+        self.max_chars = max_chars
+        self.min_repeats = max(1, min_repeats)
+        self.voice = ""
+        self.rate = 0
+        self._pinned: dict[str, tuple[np.ndarray, int]] = {}
+        self._pinned_texts: set[str] = set()
+        self._dynamic: "OrderedDict[str, tuple[np.ndarray, int]]" = OrderedDict()
+        self._pending: set[str] = set()
+        # Miss counts of short uncached phrases, bounded like the dynamic entries.
+        self._seen: "OrderedDict[str, int]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def configure(self, voice: str, rate: int) -> None:
+        """Bind the cache to the engine's voice/rate; entries for other settings are not reused."""
+        with self._lock:
+            if (voice, rate) != (self.voice, self.rate):
+                self.voice, self.rate = voice, rate
+                self._pinned.clear()
+                self._dynamic.clear()
+
+    def path_for(self, text: str) -> Path:
+        digest = hashlib.sha1(f"{self.voice}|{self.rate}|{text}".encode("utf-8")).hexdigest()
+        return self.cache_dir / f"{digest}.wav"
+
+    def pin(self, phrases) -> list[str]:
+        """Mark phrases as permanent; returns those that still need rendering."""
+        missing = []
+        for text in phrases:
+            text = text.strip()
+            if not text:
+                continue
+            with self._lock:
+                self._pinned_texts.add(text)
+            if self._load(text) is None:
+                missing.append(text)
+        return missing
+
+    def _load(self, text: str) -> tuple[np.ndarray, int] | None:
+        with self._lock:
+            if text in self._pinned:
+                return self._pinned[text]
+            if text in self._dynamic:
+                self._dynamic.move_to_end(text)
+                return self._dynamic[text]
+        loaded = _read_wav(self.path_for(text))
+        if loaded is None:
+            return None
+        pcm, sample_rate = loaded
+        entry = (_trim_silence(pcm), sample_rate)
+        self._store(text, entry)
+        return entry
+
+    def _store(self, text: str, entry: tuple[np.ndarray, int]) -> None:
+        evicted = []
+        with self._lock:
+            if text in self._pinned_texts:
+                self._pinned[text] = entry
+                return
+            self._dynamic[text] = entry
+            self._dynamic.move_to_end(text)
+            while len(self._dynamic) > self.max_dynamic:
+                old_text, _ = self._dynamic.popitem(last=False)
+                evicted.append(old_text)
+        for old_text in evicted:
+            try:
+                self.path_for(old_text).unlink()
+            except OSError:
+                pass
+
+    def lookup(self, text: str) -> tuple[np.ndarray, int] | None:
+        """Return cached (int16 PCM, sample_rate) for `text`, assembling templates from fragments."""
+        text = text.strip()
+        entry = self._load(text)
+        if entry is None:
+            entry = self._assemble(text)
+        with self._lock:
+            if entry is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return entry
+
+    def _assemble(self, text: str) -> tuple[np.ndarray, int] | None:
+        for pattern, build in TEMPLATES:
+            match = pattern.match(text)
+            if not match:
+                continue
+            fragments = build(match)
+            if not fragments:
+                return None
+            parts = [self._load(fragment) for fragment in fragments]
+            if any(part is None for part in parts):
+                return None
+            sample_rate = parts[0][1]
+            if any(rate != sample_rate for _, rate in parts):
+                return None
+            gap = np.zeros(int(sample_rate * FRAGMENT_GAP_SECONDS), dtype=np.int16)
+            pieces = []
+            for pcm, _ in parts:
+                pieces.extend([pcm, gap])
+            return np.concatenate(pieces[:-1]), sample_rate
+        return None
+
+    def wants(self, text: str) -> list[str]:
+        """Phrases worth rendering after a miss on `text` (the phrase itself or its fragments)."""
+        text = text.strip()
+        for pattern, build in TEMPLATES:
+            match = pattern.match(text)
+            if match:
+                return [fragment for fragment in build(match) or [] if self._load(fragment) is None]
+        with self._lock:
+            if text in self._pinned_texts:
+                return [text]
+            if len(text) > self.max_chars:
+                return []
+            seen = self._seen.pop(text, 0) + 1
+            if seen >= self.min_repeats:
+                return [text]
+            self._seen[text] = seen
+            while len(self._seen) > self.max_dynamic * 4:
+                self._seen.popitem(last=False)
+        return []
+
+    def claim(self, text: str) -> bool:
+        """Reserve `text` for rendering so it is queued only once."""
+        with self._lock:
+            if text in self._pending:
+                return False
+            self._pending.add(text)
+            return True
+
+    def add_rendered(self, text: str) -> bool:
+        """Load a freshly rendered WAV for `text` (written to `path_for(text)`)."""
+        with self._lock:
+            self._pending.discard(text)
+        return self._load(text) is not None
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "pinned": len(self._pinned),
+                "dynamic": len(self._dynamic),
+                "hits": self.hits,
+                "misses": self.misses,
+            }
+
+
+cache = AudioCache()
@@ -0,0 +1,196 @@
+import os
+import threading
+import time
+import wave
+
+import numpy as np
+
+SAMPLE_RATE = 16000
+CHANNELS = 1
+BLOCK_DURATION_SECONDS = 0.1
+BLOCKSIZE = int(SAMPLE_RATE * BLOCK_DURATION_SECONDS)
+RING_SECONDS = float(os.getenv("STT_RING_SECONDS", "30"))
+
+
+class RingBuffer:
+    """Fixed-size float32 ring addressed by absolute sample positions.
+
+    `write` copies into preallocated storage, so the capture callback never allocates.
+    `read` returns a view into the ring when the range does not wrap; only wrapped
+    ranges are copied. Views stay valid until the writer laps them (`capacity`
+    samples later), which is far longer than any utterance we extract.
+    """
+
+    def __init__(self, capacity: int):
+        self.capacity = int(capacity)
+        self._data = np.zeros(self.capacity, dtype=np.float32)
+        self._written = 0
+        self._cond = threading.Condition()
+
+    @property
+    def position(self) -> int:
+        """Absolute index one past the newest sample."""
+        return self._written
+
+    @property
+    def oldest(self) -> int:
+        return max(0, self._written - self.capacity)
+
+    def write(self, samples: np.ndarray) -> None:
+        count = samples.shape[0]
+        if count > self.capacity:
+            samples = samples[-self.capacity :]
+            self._written += count - self.capacity
+            count = self.capacity
+        offset = self._written % self.capacity
+        first = min(count, self.capacity - offset)
+        self._data[offset : offset + first] = samples[:first]
+        if first < count:
+            self._data[: count - first] = samples[first:]
+        with self._cond:
+            self._written += count
+            self._cond.notify_all()
+
+    def read(self, start: int, end: int) -> np.ndarray:
+        start = max(start, self.oldest)
+        end = min(end, self._written)
+        if end <= start:
+            return self._data[:0]
+        offset = start % self.capacity
+        length = end - start
+        if offset + length <= self.capacity:
+            return self._data[offset : offset + length]
+        return np.concatenate((self._data[offset:], self._data[: offset + length - self.capacity]))
+
+    def wait_for(self, position: int, timeout: float) -> bool:
+        """Block until `position` samples have been written or the timeout expires."""
+        with self._cond:
+            return self._cond.wait_for(lambda: self._written >= position, timeout)
+
+
+class MicrophoneSource:
+    """Default input device via one long-lived sounddevice stream."""
+
+    def __init__(self, sample_rate: int = SAMPLE_RATE, blocksize: int = BLOCKSIZE):
+        self.sample_rate = sample_rate
+        self.blocksize = blocksize
+        self._stream = None
+
+    def start(self, ring: RingBuffer) -> None:
+        import sounddevice as sd
+
+        def _callback(indata, frames, callback_time, status):
+            if status:
+                print(status)
+            # indata shape: (frames, channels)
+            ring.write(indata[:, 0])
+
+        self._stream = sd.InputStream(
+            samplerate=self.sample_rate,
+            channels=CHANNELS,
+            dtype="float32",
+            blocksize=self.blocksize,
+            callback=_callback,
+        )
+        self._stream.start()
+
+    def stop(self) -> None:
+        if self._stream is not None:
+            self._stream.stop()
+            self._stream.close()
+            self._stream = None
+
+
+class WavFileSource:
+    """Feed a 16-bit mono WAV file into the ring, optionally paced like a live microphone.
+
+    After the file ends the source keeps writing silence so silence-based endpointing
+    still terminates, unless `loop` is set.
+    """
+
+    def __init__(self, path: str, realtime: bool = True, loop: bool = False, blocksize: int = BLOCKSIZE):
+        self.path = path
+        self.realtime = realtime
+        self.loop = loop
+        self.blocksize = blocksize
+        self.sample_rate = SAMPLE_RATE
+        self.finished = threading.Event()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def _load(self) -> np.ndarray:
+        with wave.open(self.path, "rb") as wav:
+            if wav.getsampwidth() != 2:
+                raise ValueError("Only 16-bit PCM WAV files are supported.")
+            if wav.getframerate() != self.sample_rate:
+                raise ValueError(f"WAV sample rate must be {self.sample_rate} Hz.")
+            channels = wav.getnchannels()
+            frames = wav.readframes(wav.getnframes())
+        pcm = np.frombuffer(frames, dtype=np.int16).reshape(-1, channels)[:, 0]
+        return pcm.astype(np.float32) / 32768.0
+
+    def start(self, ring: RingBuffer) -> None:
+        audio = self._load()
+        silence = np.zeros(self.blocksize, dtype=np.float32)
+        block_seconds = self.blocksize / self.sample_rate
+
+        def _run():
+            offset = 0
+            next_tick = time.monotonic()
+            while not self._stop.is_set():
+                if offset < audio.shape[0]:
+                    block = audio[offset : offset + self.blocksize]
+                    offset += self.blocksize
+                else:
+                    self.finished.set()
+                    if self.loop:
+                        offset = 0
+                        continue
+                    block = silence
+                ring.write(block)
+                if self.realtime:
+                    next_tick += block_seconds
+                    time.sleep(max(0.0, next_tick - time.monotonic()))
+                elif self.finished.is_set():
+                    time.sleep(block_seconds)
+
+        self._thread = threading.Thread(target=_run, name="wav-source", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=1)
+            self._thread = None
+
+
+class AudioCapture:
+    """Always-on capture: one source writing continuously into one ring buffer."""
+
+    def __init__(self, source=None, ring_seconds: float = RING_SECONDS):
+        self.source = source or MicrophoneSource()
+        self.ring = RingBuffer(int(SAMPLE_RATE * ring_seconds))
+        self._started = False
+        self._lock = threading.Lock()
+
+    def start(self) -> None:
+        with self._lock:
+            if not self._started:
+                self.source.start(self.ring)
+                self._started = True
+
+    def stop(self) -> None:
+        with self._lock:
+            if self._started:
+                self.source.stop()
+                self._started = False
+
+    @property
+    def position(self) -> int:
+        return self.ring.position
+
+    def read(self, start: int, end: int) -> np.ndarray:
+        return self.ring.read(start, end)
+
+    def wait_for(self, position: int, timeout: float) -> bool:
+        return self.ring.wait_for(position, timeout)
@@ -0,0 +1,121 @@
+import queue
+import re
+import threading
+from collections.abc import Callable, Iterable
+
+from app.voice.text_to_speech import register_stop_handler, speak, unregister_stop_handler
+
+_SENTENCE_END = re.compile(r"[.!?]+[\"')\]]*\s+|\n+")
+_SOFT_BREAK = re.compile(r"[,;:]\s+")
+MAX_PENDING_CHARS = 220
+
+
+def split_sentences(buffer: str) -> tuple[list[str], str]:
+    """Split complete sentences off the front of `buffer`, returning (sentences, remainder)."""
+    sentences = []
+    start = 0
+    for match in _SENTENCE_END.finditer(buffer):
+        sentence = buffer[start : match.end()].strip()
+        if sentence:
+            sentences.append(sentence)
+        start = match.end()
+    remainder = buffer[start:]
+
+    # Very long run-on text: break at the last clause boundary so speech can start.
+    if len(remainder) > MAX_PENDING_CHARS:
+        soft = None
+        for soft in _SOFT_BREAK.finditer(remainder):
+            pass
+        cut = soft.end() if soft else remainder.rfind(" ") + 1
+        if cut > 0:
+            sentences.append(remainder[:cut].strip())
+            remainder = remainder[cut:]
+    return sentences, remainder
+
+
+class SentencePipeline:
+    """Speak a token stream sentence by sentence while the rest is still being generated.
+
+    Tokens are buffered with `feed`; every complete sentence is queued for the speech
+    worker immediately. `cancel` (also triggered by `stop_speaking`) drops queued
+    sentences and sets `cancel_event`, which the LLM stream watches to abort generation.
+    """
+
+    def __init__(self, speak_fn: Callable[[str], None] = speak):
+        self._speak = speak_fn
+        self._buffer = ""
+        self._queue: "queue.Queue[str | None]" = queue.Queue()
+        self._closed = False
+        self._done = threading.Event()
+        self.cancel_event = threading.Event()
+        self.spoken_any = False
+        self.fed_any = False
+        register_stop_handler(self.cancel)
+        self._worker = threading.Thread(target=self._run, daemon=True)
+        self._worker.start()
+
+    def feed(self, token: str) -> None:
+        if self._closed or self.cancel_event.is_set() or not token:
+            return
+        self.fed_any = True
+        self._buffer += token
+        sentences, self._buffer = split_sentences(self._buffer)
+        for sentence in sentences:
+            self._queue.put(sentence)
+
+    def feed_all(self, tokens: Iterable[str]) -> None:
+        for token in tokens:
+            if self.cancel_event.is_set():
+                break
+            self.feed(token)
+
+    def close(self) -> None:
+        """Flush the trailing partial sentence and let the worker finish."""
+        if self._closed:
+            return
+        tail = self._buffer.strip()
+        self._buffer = ""
+        if tail and not self.cancel_event.is_set():
+            self._queue.put(tail)
+        self._closed = True
+        self._queue.put(None)
+
+    def cancel(self) -> None:
+        self.cancel_event.set()
+        self._drain()
+        if not self._closed:
+            self._closed = True
+            self._queue.put(None)
+
+    def is_active(self) -> bool:
+        return not self._done.is_set()
+
+    def join(self, timeout: float | None = None) -> None:
+        self._done.wait(timeout)
+
+    def _drain(self) -> None:
+        while True:
+            try:
+                self._queue.get_nowait()
+            except queue.Empty:
+                return
+
+    def _run(self) -> None:
+        try:
+            while True:
+                sentence = self._queue.get()
+                if sentence is None or self.cancel_event.is_set():
+                    break
+                self.spoken_any = True
+                self._speak(sentence)
+        finally:
+            unregister_stop_handler(self.cancel)
+            self._done.set()
+
+
+def speak_stream(tokens: Iterable[str]) -> SentencePipeline:
+    """Feed a whole token iterator into a new pipeline and close it (blocks while feeding)."""
+    pipeline = SentencePipeline()
+    pipeline.feed_all(tokens)
+    pipeline.close()
+    return pipeline
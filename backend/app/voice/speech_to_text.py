@@ -1,95 +1,187 @@
 import os
-import queue
+import threading
 import time
+from collections.abc import Callable
 from typing import Optional
 
 import numpy as np
-import sounddevice as sd
-from faster_whisper import WhisperModel
 
-SAMPLE_RATE = 16000
-CHANNELS = 1
-BLOCK_DURATION_SECONDS = 0.1
-BLOCKSIZE = int(SAMPLE_RATE * BLOCK_DURATION_SECONDS)
+from app.voice.audio_capture import (
+    BLOCKSIZE,
+    SAMPLE_RATE,
+    AudioCapture,
+    MicrophoneSource,
+    WavFileSource,
+)
+from app.voice.streaming_stt import StreamingTranscriber
+from app.voice.vad import VoiceActivityDetector
 
 STT_MODEL_SIZE = os.getenv("STT_MODEL_SIZE", "small.en")
 STT_DEVICE = os.getenv("STT_DEVICE", "cpu")
 STT_COMPUTE_TYPE = os.getenv("STT_COMPUTE_TYPE", "int8")
-STT_ENERGY_THRESHOLD = float(os.getenv("STT_ENERGY_THRESHOLD", "0.012"))
+STT_END_SILENCE_SECONDS = float(os.getenv("STT_END_SILENCE_SECONDS", "0.6"))
+STT_AUDIO_SOURCE = os.getenv("STT_AUDIO_SOURCE", "").strip()
+STT_PREROLL_SECONDS = float(os.getenv("STT_PREROLL_SECONDS", "0.3"))
+STT_MAX_BACKLOG_SECONDS = 2.0
+STT_STREAMING = os.getenv("STT_STREAMING", "1") != "0"
 
-_audio_queue: "queue.Queue[np.ndarray]" = queue.Queue()
-_model = WhisperModel(
-    STT_MODEL_SIZE,
-    device=STT_DEVICE,
-    compute_type=STT_COMPUTE_TYPE,
-)
+_model = None
+_model_lock = threading.Lock()
+_model_ready = threading.Event()
+_model_error: str | None = None
+_capture: AudioCapture | None = None
+_capture_lock = threading.Lock()
+# Absolute ring position up to which audio has already been handed out, so the
+# pre-roll of the next utterance never re-transcribes the previous one.
+_consumed_position = 0
+_last_stats: dict = {}
+# Shared so the adaptive noise floor carries over between utterances.
+_vad = VoiceActivityDetector()
+
+
+def _get_model():
+    """Load the Whisper model on first use; later calls return the loaded instance."""
+    global _model, _model_error
+    with _model_lock:
+        if _model is None:
+            try:
+                from faster_whisper import WhisperModel
+
+                _model = WhisperModel(
+                    STT_MODEL_SIZE,
+                    device=STT_DEVICE,
+                    compute_type=STT_COMPUTE_TYPE,
+                )
+            except Exception as e:
+                _model_error = str(e)
+                raise
+            _model_error = None
+            _model_ready.set()
+        return _model
+
+
+def warmup_model() -> threading.Thread:
+    """Load the Whisper model on a background thread so startup does not block on it."""
+
+    def _load():
+        try:
+            _get_model()
+        except Exception as e:
+            print(f"Could not load Whisper model: {e}")
+
+    thread = threading.Thread(target=_load, name="stt-warmup", daemon=True)
+    thread.start()
+    return thread
+
+
+def is_model_ready() -> bool:
+    return _model_ready.is_set()
+
+
+def get_model_status() -> dict:
+    return {
+        "model": STT_MODEL_SIZE,
+        "ready": _model_ready.is_set(),
+        "error": _model_error,
+    }
+
+
+def _default_source():
+    if STT_AUDIO_SOURCE:
+        return WavFileSource(STT_AUDIO_SOURCE)
+    return MicrophoneSource()
 
 
-def _audio_callback(indata, frames, callback_time, status):
-    if status:
-        print(status)
-    # indata shape: (frames, channels)
-    mono = indata[:, 0].copy()
-    _audio_queue.put(mono)
+def get_capture() -> AudioCapture:
+    """Return the shared always-on capture, starting it on first use."""
+    global _capture
+    with _capture_lock:
+        if _capture is None:
+            _capture = AudioCapture(_default_source())
+        _capture.start()
+        return _capture
 
 
-def _rms(chunk: np.ndarray) -> float:
-    if chunk.size == 0:
-        return 0.0
-    return float(np.sqrt(np.mean(np.square(chunk), dtype=np.float64)))
+def set_audio_source(source) -> AudioCapture:
+    """Replace the capture source (e.g. a `WavFileSource` in tests)."""
+    global _capture, _consumed_position
+    with _capture_lock:
+        if _capture is not None:
+            _capture.stop()
+        _capture = AudioCapture(source)
+        _consumed_position = 0
+    return get_capture()
+
+
+def stop_capture() -> None:
+    with _capture_lock:
+        if _capture is not None:
+            _capture.stop()
 
 
 def _capture_until_silence(
     max_seconds: float,
     min_seconds: float,
     silence_seconds: float,
+    on_audio: Callable[[np.ndarray], None] | None = None,
 ) -> Optional[np.ndarray]:
+    """Record one utterance from the ring; `on_audio` sees the growing utterance per block."""
+    global _consumed_position
     if max_seconds <= 0:
         return None
 
-    chunks: list[np.ndarray] = []
-    started_speaking = False
-    silence_run = 0.0
+    capture = get_capture()
+    ring = capture.ring
+    # Resume where the previous capture stopped (audio heard while transcribing is not
+    # lost), but never replay more than a short backlog.
+    backlog = int(SAMPLE_RATE * STT_MAX_BACKLOG_SECONDS)
+    position = max(_consumed_position, capture.position - backlog, ring.oldest)
+    first_position = vad_origin = position
+    speech_start = None
     start_time = time.time()
+    _vad.reset()
 
-    with sd.InputStream(
-        samplerate=SAMPLE_RATE,
-        channels=CHANNELS,
-        dtype="float32",
-        blocksize=BLOCKSIZE,
-        callback=_audio_callback,
-    ):
-        while True:
-            elapsed = time.time() - start_time
-            if elapsed >= max_seconds:
-                break
-
-            try:
-                chunk = _audio_queue.get(timeout=0.3)
-            except queue.Empty:
-                continue
+    while True:
+        # Endpointing runs on audio time so file sources behave like a live microphone;
+        # the wall-clock check only guards against a stalled device.
+        elapsed = (position - first_position) / SAMPLE_RATE
+        if elapsed >= max_seconds or time.time() - start_time >= max_seconds + 1.0:
+            break
 
-            chunks.append(chunk)
-            energy = _rms(chunk)
+        if not capture.wait_for(position + BLOCKSIZE, timeout=0.3):
+            continue
+        if position < ring.oldest:
+            # The ring overran a slow reader; restart frame accounting at the oldest sample.
+            position = vad_origin = ring.oldest
+            _vad.reset()
+        chunk = capture.read(position, position + BLOCKSIZE)
+        _vad.process(chunk)
 
-            if energy >= STT_ENERGY_THRESHOLD:
-                started_speaking = True
-                silence_run = 0.0
-            elif started_speaking:
-                silence_run += BLOCK_DURATION_SECONDS
+        if _vad.in_speech and speech_start is None:
+            onset = vad_origin + _vad.onset_frame * _vad.frame_length
+            preroll = int(SAMPLE_RATE * STT_PREROLL_SECONDS)
+            speech_start = max(onset - preroll, _consumed_position, ring.oldest)
+        position += chunk.shape[0]
+        if on_audio is not None and speech_start is not None:
+            on_audio(capture.read(speech_start, position))
 
-            if started_speaking and elapsed >= min_seconds and silence_run >= silence_seconds:
-                break
+        if (
+            speech_start is not None
+            and elapsed >= min_seconds
+            and _vad.trailing_silence_seconds >= silence_seconds
+        ):
+            break
 
-    if not started_speaking or not chunks:
+    _consumed_position = position
+    if speech_start is None:
         return None
 
-    audio = np.concatenate(chunks, axis=0).astype(np.float32, copy=False)
-    return audio
+    # View over the ring buffer (copied only if the utterance wraps around its end).
+    return capture.read(speech_start, position)
 
 
 def _transcribe(audio: np.ndarray) -> Optional[str]:
-    segments, _ = _model.transcribe(
+    segments, _ = _get_model().transcribe(
         audio,
         language="en",
         beam_size=2,
@@ -99,17 +191,74 @@ def _transcribe(audio: np.ndarray) -> Optional[str]:
     return text or None
 
 
-def listen() -> Optional[str]:
-    print("Listening (faster-whisper)...")
+def get_last_transcription_stats() -> dict:
+    """Timing of the most recent `listen()` utterance, including its real-time factor."""
+    return dict(_last_stats)
+
+
+def _record_stats(stats: dict) -> None:
+    global _last_stats
+    _last_stats = stats
+    print(
+        f"STT: {stats['audio_seconds']:.2f}s audio, rtf={stats['real_time_factor']:.2f}, "
+        f"final tail {stats['final_tail_seconds']:.2f}s decoded in {stats['final_decode_seconds']:.2f}s"
+    )
+
+
+def _listen_streaming(on_partial: Callable[[str], None] | None) -> Optional[str]:
+    transcriber = StreamingTranscriber(_get_model(), on_partial=on_partial)
     audio = _capture_until_silence(
         max_seconds=8.0,
         min_seconds=0.7,
-        silence_seconds=0.9,
+        silence_seconds=STT_END_SILENCE_SECONDS,
+        on_audio=transcriber.update,
     )
     if audio is None:
         return None
+    text = transcriber.finalize(audio)
+    _record_stats(transcriber.stats.as_dict())
+    return text
+
+
+def listen(
+    on_partial: Callable[[str], None] | None = None,
+    gate: Callable[[np.ndarray], bool] | None = None,
+) -> Optional[str]:
+    """Capture and transcribe one utterance.
+
+    In streaming mode (`STT_STREAMING`, default on) the utterance is decoded while the
+    user is still speaking and `on_partial` receives the stable text so far. A `gate`
+    (e.g. the wake-word spotter) sees the captured audio first; when it rejects the
+    burst, Whisper is not run at all.
+    """
+    print("Listening (faster-whisper)...")
+    if STT_STREAMING and gate is None:
+        text = _listen_streaming(on_partial)
+    else:
+        audio = _capture_until_silence(
+            max_seconds=8.0,
+            min_seconds=0.7,
+            silence_seconds=STT_END_SILENCE_SECONDS,
+        )
+        if audio is None:
+            return None
+        if gate is not None and not gate(audio):
+            return None
+        started = time.perf_counter()
+        text = _transcribe(audio)
+        decode_seconds = time.perf_counter() - started
+        audio_seconds = audio.shape[0] / SAMPLE_RATE
+        _record_stats(
+            {
+                "audio_seconds": round(audio_seconds, 3),
+                "decode_seconds": round(decode_seconds, 3),
+                "final_decode_seconds": round(decode_seconds, 3),
+                "final_tail_seconds": round(audio_seconds, 3),
+                "decodes": 1,
+                "real_time_factor": round(decode_seconds / audio_seconds, 3) if audio_seconds else 0.0,
+            }
+        )
 
-    text = _transcribe(audio)
     if text:
         print(f"You said: {text}")
     return text
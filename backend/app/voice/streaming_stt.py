@@ -0,0 +1,141 @@
+import os
+import re
+import time
+from collections.abc import Callable
+from dataclasses import dataclass
+
+import numpy as np
+
+from app.voice.audio_capture import SAMPLE_RATE
+
+STT_STREAM_STEP_SECONDS = float(os.getenv("STT_STREAM_STEP_SECONDS", "0.8"))
+STT_STREAM_WINDOW_SECONDS = float(os.getenv("STT_STREAM_WINDOW_SECONDS", "12"))
+
+
+@dataclass
+class _Word:
+    text: str
+    end: float  # seconds from the start of the utterance
+
+    @property
+    def key(self) -> str:
+        return re.sub(r"[^a-z0-9']+", "", self.text.lower())
+
+
+@dataclass
+class TranscriptionStats:
+    audio_seconds: float = 0.0
+    decode_seconds: float = 0.0
+    final_decode_seconds: float = 0.0
+    final_tail_seconds: float = 0.0
+    decodes: int = 0
+
+    @property
+    def real_time_factor(self) -> float:
+        if self.audio_seconds <= 0:
+            return 0.0
+        return self.decode_seconds / self.audio_seconds
+
+    def as_dict(self) -> dict:
+        return {
+            "audio_seconds": round(self.audio_seconds, 3),
+            "decode_seconds": round(self.decode_seconds, 3),
+            "final_decode_seconds": round(self.final_decode_seconds, 3),
+            "final_tail_seconds": round(self.final_tail_seconds, 3),
+            "decodes": self.decodes,
+            "real_time_factor": round(self.real_time_factor, 3),
+        }
+
+
+class StreamingTranscriber:
+    """Incremental Whisper decoding of an utterance that is still growing.
+
+    Every `step_seconds` of new audio the uncommitted part of the utterance is
+    re-decoded. Words on which two consecutive hypotheses agree are committed
+    (local agreement) and the decode window start moves past them, so each pass
+    only covers the unstable tail (bounded by `max_window_seconds`). At end of speech
+    `finalize` decodes just that tail.
+    """
+
+    def __init__(
+        self,
+        model,
+        on_partial: Callable[[str], None] | None = None,
+        step_seconds: float = STT_STREAM_STEP_SECONDS,
+        max_window_seconds: float = STT_STREAM_WINDOW_SECONDS,
+        beam_size: int = 2,
+    ):
+        self.model = model
+        self.on_partial = on_partial
+        self.step_samples = int(SAMPLE_RATE * step_seconds)
+        self.max_window_samples = int(SAMPLE_RATE * max_window_seconds)
+        self.beam_size = beam_size
+        self.stats = TranscriptionStats()
+        self._committed: list[_Word] = []
+        self._committed_samples = 0
+        self._pending: list[_Word] = []
+        self._decoded_upto = 0
+
+    @property
+    def stable_text(self) -> str:
+        return "".join(word.text for word in self._committed).strip()
+
+    def _decode(self, audio: np.ndarray, offset_samples: int) -> list[_Word]:
+        started = time.perf_counter()
+        segments, _ = self.model.transcribe(
+            audio[offset_samples:],
+            language="en",
+            beam_size=self.beam_size,
+            word_timestamps=True,
+            condition_on_previous_text=False,
+            initial_prompt=self.stable_text or None,
+        )
+        offset_seconds = offset_samples / SAMPLE_RATE
+        words = [
+            _Word(word.word, offset_seconds + word.end)
+            for segment in segments
+            for word in (segment.words or [])
+        ]
+        self.stats.decode_seconds += time.perf_counter() - started
+        self.stats.decodes += 1
+        return words
+
+    def _commit(self, words: list[_Word]) -> None:
+        if not words:
+            return
+        self._committed.extend(words)
+        self._committed_samples = int(words[-1].end * SAMPLE_RATE)
+        if self.on_partial:
+            self.on_partial(self.stable_text)
+
+    def update(self, audio: np.ndarray) -> None:
+        """Feed the whole utterance so far; decodes only when a step of new audio arrived."""
+        if audio.shape[0] - self._decoded_upto < self.step_samples:
+            return
+        self._decoded_upto = audio.shape[0]
+        hypothesis = self._decode(audio, self._committed_samples)
+
+        agreed = 0
+        for previous, current in zip(self._pending, hypothesis):
+            if previous.key != current.key:
+                break
+            agreed += 1
+
+        # The window grew too long without agreement: commit all but the last words.
+        if agreed == 0 and audio.shape[0] - self._committed_samples > self.max_window_samples:
+            agreed = max(0, len(hypothesis) - 2)
+
+        self._commit(hypothesis[:agreed])
+        self._pending = hypothesis[agreed:]
+
+    def finalize(self, audio: np.ndarray) -> str | None:
+        """Decode the unstable tail once more and return the full transcript."""
+        tail_samples = audio.shape[0] - self._committed_samples
+        started = time.perf_counter()
+        tail = self._decode(audio, self._committed_samples) if tail_samples > 0 else []
+        self.stats.final_decode_seconds = time.perf_counter() - started
+        self.stats.final_tail_seconds = max(0, tail_samples) / SAMPLE_RATE
+        self.stats.audio_seconds = audio.shape[0] / SAMPLE_RATE
+        self._committed.extend(tail)
+        self._pending = []
+        return self.stable_text or None
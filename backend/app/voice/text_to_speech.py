@@ -1,31 +1,242 @@
+import os
+import queue
 import threading
 import time
+from dataclasses import dataclass, field
 
 import pyttsx3
+import sounddevice as sd
+
+from app.voice.audio_cache import NUMBER_FRAGMENTS, TEMPLATE_FRAGMENTS, cache as audio_cache
+
+TTS_RATE = int(os.getenv("TTS_RATE", "165"))
+TTS_VOLUME = float(os.getenv("TTS_VOLUME", "1.0"))
+TTS_VOICE = os.getenv("TTS_VOICE", "zira").strip().lower()
+TTS_AUDIO_CACHE = os.getenv("TTS_AUDIO_CACHE", "1") != "0"
+# Rendering blocks the worker, so it waits for a real pause, not the gap between two
+# sentences of a reply that is still being generated.
+RENDER_IDLE_SECONDS = 2.0
 
-_engine_lock = threading.Lock()
-_current_engine = None
 _speaking_event = threading.Event()
+_handlers_lock = threading.Lock()
+_stop_handlers: list = []
+
+
+@dataclass
+class _Utterance:
+    text: str
+    generation: int = 0
+    done: threading.Event = field(default_factory=threading.Event)
+
+
+class SpeechWorker:
+    """Long-lived TTS thread owning a single pyttsx3 engine.
+
+    The engine is created and configured once (including the voice lookup) on the
+    worker thread, which is where SAPI/NSSpeech expect it to be driven from.
+    Utterances are queued; `flush` drops anything queued and stops the current one.
+    Phrases found in the audio cache are played as PCM instead of synthesized, and
+    repeated cache misses are rendered to disk once the worker has been idle a while.
+    """
+
+    def __init__(self, rate: int = TTS_RATE, volume: float = TTS_VOLUME, voice: str = TTS_VOICE):
+        self.rate = rate
+        self.volume = volume
+        self.voice = voice
+        self.voice_id: str | None = None
+        self._queue: "queue.Queue[_Utterance | None]" = queue.Queue()
+        self._render_queue: "queue.Queue[str]" = queue.Queue()
+        self._playing_cached = False
+        self._engine = None
+        self._engine_lock = threading.Lock()
+        self._ready = threading.Event()
+        self._generation = 0
+        self._thread = threading.Thread(target=self._run, name="tts-worker", daemon=True)
+        self._thread.start()
+
+    def _create_engine(self):
+        engine = pyttsx3.init()
+        engine.setProperty("rate", self.rate)
+        engine.setProperty("volume", self.volume)
+        if self.voice:
+            for voice in engine.getProperty("voices"):
+                if self.voice in voice.name.lower():
+                    engine.setProperty("voice", voice.id)
+                    self.voice_id = voice.id
+                    break
+        return engine
+
+    def wait_ready(self, timeout: float | None = None) -> bool:
+        return self._ready.wait(timeout)
+
+    def submit(self, text: str) -> _Utterance:
+        utterance = _Utterance(text, generation=self._generation)
+        self._queue.put(utterance)
+        return utterance
+
+    def precache(self, phrases) -> None:
+        """Pin phrases in the audio cache and render any that are not on disk yet."""
+        if not TTS_AUDIO_CACHE:
+            return
+        self._ready.wait()
+        for text in audio_cache.pin(phrases):
+            self._queue_render(text)
+
+    def _queue_render(self, text: str) -> None:
+        if audio_cache.claim(text):
+            self._render_queue.put(text)
+
+    def _render(self, engine, text: str) -> None:
+        try:
+            engine.save_to_file(text, str(audio_cache.path_for(text)))
+            engine.runAndWait()
+        except Exception:
+            pass
+        audio_cache.add_rendered(text)
+
+    def _say(self, engine, text: str) -> None:
+        audio = audio_cache.lookup(text) if TTS_AUDIO_CACHE else None
+        if audio is not None:
+            pcm, sample_rate = audio
+            self._playing_cached = True
+            try:
+                sd.play(pcm, sample_rate)
+                sd.wait()
+            finally:
+                self._playing_cached = False
+            return
+
+        engine.say(text)
+        engine.runAndWait()
+        if TTS_AUDIO_CACHE:
+            for phrase in audio_cache.wants(text):
+                self._queue_render(phrase)
+
+    def flush(self) -> None:
+        """Drop queued utterances and stop the one currently playing."""
+        self._generation += 1
+        while True:
+            try:
+                pending = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if pending is not None:
+                pending.done.set()
+        with self._engine_lock:
+            engine = self._engine
+        if self._playing_cached:
+            try:
+                sd.stop()
+            except Exception:
+                pass
+        elif engine is not None and _speaking_event.is_set():
+            try:
+                engine.stop()
+            except Exception:
+                pass
+
+    def shutdown(self) -> None:
+        self.flush()
+        self._queue.put(None)
+
+    def _run(self) -> None:
+        try:
+            engine = self._create_engine()
+        except Exception:
+            engine = None
+        with self._engine_lock:
+            self._engine = engine
+        if engine is not None and TTS_AUDIO_CACHE:
+            audio_cache.configure(self.voice_id or "", self.rate)
+            audio_cache.cache_dir.mkdir(parents=True, exist_ok=True)
+            for text in audio_cache.pin(TEMPLATE_FRAGMENTS + NUMBER_FRAGMENTS):
+                self._queue_render(text)
+        self._ready.set()
+
+        idle_since = time.monotonic()
+        while True:
+            try:
+                utterance = self._queue.get(timeout=0.2)
+            except queue.Empty:
+                # Idle: render one pending cache entry at a time so speech is never delayed long.
+                if engine is not None and time.monotonic() - idle_since >= RENDER_IDLE_SECONDS:
+                    try:
+                        self._render(engine, self._render_queue.get_nowait())
+                    except queue.Empty:
+                        pass
+                continue
+            if utterance is None:
+                break
+            if utterance.generation != self._generation:
+                # Submitted before the last flush; it was dequeued before flush could drop it.
+                utterance.done.set()
+                continue
+            try:
+                if engine is not None:
+                    _speaking_event.set()
+                    self._say(engine, utterance.text)
+            except Exception:
+                pass
+            finally:
+                _speaking_event.clear()
+                utterance.done.set()
+                idle_since = time.monotonic()
+
+
+_worker: SpeechWorker | None = None
+_worker_lock = threading.Lock()
+
+
+def get_worker() -> SpeechWorker:
+    global _worker
+    with _worker_lock:
+        if _worker is None:
+            _worker = SpeechWorker()
+        return _worker
+
 
+def warmup(phrases=()) -> None:
+    """Start the TTS worker so engine construction happens before the first reply.
 
-def _set_current_engine(engine):
-    global _current_engine
-    with _engine_lock:
-        _current_engine = engine
+    `phrases` are pinned in the audio cache and pre-rendered in the background.
+    """
+    worker = get_worker()
+    if phrases:
+        threading.Thread(target=worker.precache, args=(list(phrases),), daemon=True).start()
+
+
+def get_audio_cache_stats() -> dict:
+    return audio_cache.stats()
 
 
 def is_speaking() -> bool:
     return _speaking_event.is_set()
 
 
+def register_stop_handler(handler) -> None:
+    """Call `handler()` on every `stop_speaking` (used to flush queued speech and generation)."""
+    with _handlers_lock:
+        _stop_handlers.append(handler)
+
+
+def unregister_stop_handler(handler) -> None:
+    with _handlers_lock:
+        if handler in _stop_handlers:
+            _stop_handlers.remove(handler)
+
+
 def stop_speaking() -> None:
-    with _engine_lock:
-        engine = _current_engine
-    if engine is not None:
+    with _handlers_lock:
+        handlers = list(_stop_handlers)
+    for handler in handlers:
         try:
-            engine.stop()
+            handler()
         except Exception:
             pass
+    with _worker_lock:
+        worker = _worker
+    if worker is not None:
+        worker.flush()
 
 
 def speak(text: str):
@@ -33,32 +244,7 @@ def speak(text: str):
         return
 
     print(f"AI says: {text}")
-    engine = None
-    _speaking_event.set()
-    try:
-        engine = pyttsx3.init()
-        engine.setProperty("rate", 165)
-        engine.setProperty("volume", 1.0)
-
-        for voice in engine.getProperty("voices"):
-            if "zira" in voice.name.lower():
-                engine.setProperty("voice", voice.id)
-                break
-
-        _set_current_engine(engine)
-        engine.say(text)
-        engine.runAndWait()
-    except Exception:
-        pass
-    finally:
-        if engine is not None:
-            try:
-                engine.stop()
-            except Exception:
-                pass
-        _set_current_engine(None)
-        _speaking_event.clear()
-        time.sleep(0.2)
+    get_worker().submit(text).done.wait()
 
 
 def speak_async(text: str) -> threading.Thread | None:
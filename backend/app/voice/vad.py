@@ -0,0 +1,148 @@
+import os
+import sys
+import wave
+
+import numpy as np
+
+from app.voice.audio_capture import SAMPLE_RATE
+
+STT_VAD_FRAME_MS = int(os.getenv("STT_VAD_FRAME_MS", "20"))
+STT_VAD_SNR_DB = float(os.getenv("STT_VAD_SNR_DB", "9"))
+STT_VAD_MIN_RMS = float(os.getenv("STT_VAD_MIN_RMS", "0.004"))
+STT_VAD_FLATNESS_MAX = float(os.getenv("STT_VAD_FLATNESS_MAX", "0.55"))
+STT_VAD_ONSET_FRAMES = int(os.getenv("STT_VAD_ONSET_FRAMES", "3"))
+NOISE_RISE = 0.02
+NOISE_FALL = 0.5
+LOUD_MARGIN_DB = 10.0
+
+
+def frame_features(frames: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """Per-frame energy (dBFS) and spectral flatness for a (n_frames, frame_len) batch."""
+    rms = np.sqrt(np.mean(np.square(frames, dtype=np.float64), axis=1))
+    energy_db = 20.0 * np.log10(rms + 1e-10)
+    power = np.abs(np.fft.rfft(frames * np.hanning(frames.shape[1]), axis=1)) ** 2 + 1e-12
+    flatness = np.exp(np.mean(np.log(power), axis=1)) / np.mean(power, axis=1)
+    return energy_db, flatness
+
+
+class VoiceActivityDetector:
+    """Adaptive frame-level VAD with onset and hangover logic.
+
+    Audio is split into short frames whose features are computed in one batch.
+    A frame is speech when it is well above a running noise floor, above an
+    absolute minimum, and either spectrally peaky (voiced) or very loud. The noise
+    floor follows quiet frames, falling fast and rising slowly, so it adapts to
+    a changing room without drifting up during speech.
+    """
+
+    def __init__(
+        self,
+        sample_rate: int = SAMPLE_RATE,
+        frame_ms: int = STT_VAD_FRAME_MS,
+        snr_db: float = STT_VAD_SNR_DB,
+        min_rms: float = STT_VAD_MIN_RMS,
+        flatness_max: float = STT_VAD_FLATNESS_MAX,
+        onset_frames: int = STT_VAD_ONSET_FRAMES,
+    ):
+        self.sample_rate = sample_rate
+        self.frame_length = int(sample_rate * frame_ms / 1000)
+        self.frame_seconds = self.frame_length / sample_rate
+        self.snr_db = snr_db
+        self.min_db = 20.0 * np.log10(min_rms)
+        self.flatness_max = flatness_max
+        self.onset_frames = onset_frames
+        self.noise_floor_db: float | None = None
+        self.reset()
+
+    def reset(self) -> None:
+        """Start a new utterance; the noise floor is kept because the room has not changed."""
+        self.in_speech = False
+        self.speech_run = 0
+        self.silence_run = 0
+        self.frames_seen = 0
+        self.onset_frame: int | None = None
+        self._carry = np.zeros(0, dtype=np.float32)
+
+    @property
+    def trailing_silence_seconds(self) -> float:
+        return self.silence_run * self.frame_seconds
+
+    def classify(self, audio: np.ndarray) -> np.ndarray:
+        """Speech/non-speech decision per whole frame of `audio`, updating the noise floor."""
+        usable = audio.shape[0] - audio.shape[0] % self.frame_length
+        if usable == 0:
+            return np.zeros(0, dtype=bool)
+        frames = audio[:usable].reshape(-1, self.frame_length)
+        energy_db, flatness = frame_features(frames)
+
+        if self.noise_floor_db is None:
+            self.noise_floor_db = float(np.percentile(energy_db, 10))
+        floor = self.noise_floor_db
+        above_floor = energy_db >= floor + self.snr_db
+        voiced = (flatness <= self.flatness_max) | (energy_db >= floor + self.snr_db + LOUD_MARGIN_DB)
+        decisions = above_floor & voiced & (energy_db >= self.min_db)
+
+        quiet = energy_db[~decisions]
+        if quiet.size:
+            level = float(np.mean(quiet))
+            rate = NOISE_FALL if level < floor else NOISE_RISE
+            self.noise_floor_db = floor + rate * (level - floor)
+        return decisions
+
+    def process(self, block: np.ndarray) -> np.ndarray:
+        """Classify a capture block and advance the onset/hangover state machine.
+
+        Samples that do not fill a whole frame are carried over to the next block.
+        """
+        if self._carry.size:
+            block = np.concatenate((self._carry, block))
+        decisions = self.classify(block)
+        self._carry = block[decisions.shape[0] * self.frame_length :].copy()
+
+        for index, is_speech in enumerate(decisions):
+            if is_speech:
+                self.speech_run += 1
+                self.silence_run = 0
+                if not self.in_speech and self.speech_run >= self.onset_frames:
+                    self.in_speech = True
+                    self.onset_frame = self.frames_seen + index - self.speech_run + 1
+            else:
+                self.speech_run = 0
+                if self.in_speech:
+                    self.silence_run += 1
+        self.frames_seen += decisions.shape[0]
+        return decisions
+
+
+def evaluate_wav(path: str, detector: VoiceActivityDetector | None = None) -> dict:
+    """Per-frame VAD decisions for a 16 kHz WAV file, for offline tuning and evaluation."""
+    with wave.open(path, "rb") as wav:
+        channels = wav.getnchannels()
+        frames = wav.readframes(wav.getnframes())
+    audio = np.frombuffer(frames, dtype=np.int16).reshape(-1, channels)[:, 0].astype(np.float32) / 32768.0
+    detector = detector or VoiceActivityDetector()
+    blocks = range(0, audio.shape[0], int(SAMPLE_RATE * 0.1))
+    decisions = np.concatenate([detector.process(audio[start : start + int(SAMPLE_RATE * 0.1)]) for start in blocks])
+    usable = decisions.shape[0] * detector.frame_length
+    energy_db, flatness = frame_features(audio[:usable].reshape(-1, detector.frame_length))
+    return {
+        "frame_seconds": detector.frame_seconds,
+        "decisions": decisions,
+        "energy_db": energy_db,
+        "flatness": flatness,
+        "noise_floor_db": detector.noise_floor_db,
+    }
+
+
+def _segments(decisions: np.ndarray, frame_seconds: float) -> list[tuple[float, float]]:
+    padded = np.concatenate(([False], decisions, [False])).astype(np.int8)
+    edges = np.flatnonzero(np.diff(padded))
+    return [(start * frame_seconds, end * frame_seconds) for start, end in zip(edges[::2], edges[1::2])]
+
+
+if __name__ == "__main__":
+    result = evaluate_wav(sys.argv[1])
+    speech = result["decisions"]
+    print(f"Frames: {speech.shape[0]}, speech: {speech.mean():.1%}, noise floor: {result['noise_floor_db']:.1f} dBFS")
+    for start, end in _segments(speech, result["frame_seconds"]):
+        print(f"  speech {start:6.2f}s - {end:6.2f}s")
@@ -2,54 +2,73 @@ import threading
 import time
 import re
 
-from app.brain.ai_engine import process_input_detailed
-from app.voice.speech_to_text import listen, listen_for_seconds
-from app.voice.text_to_speech import is_speaking, speak, speak_async, stop_speaking
+from app.assistant import STOPPED_RESPONSE, STREAM_RESPONSES, TextAssistant
+from app.voice.speech_to_text import listen, listen_for_seconds, warmup_model
+from app.voice.speech_pipeline import SentencePipeline, split_sentences
+from app.voice.text_to_speech import speak, stop_speaking, warmup as warmup_tts
+from app.voice.wake_word import WakeWordSpotter
 
-STOP_WORDS = {"stop"}
-EXIT_WORDS = {"quit", "exit", "bye", "close"}
 WAKE_PHRASES = ["hey jarvis", "ok jarvis", "hello jarvis"]
+GREETING = "Hello. Say hey jarvis when you need me."
+# Fixed phrases spoken often enough to pre-render into the TTS audio cache.
+CANNED_PHRASES = [
+    GREETING,
+    STOPPED_RESPONSE,
+    "Yes?",
+    "Say hey jarvis first.",
+    "Goodbye.",
+    "Okay, I stopped speaking.",
+    "Okay. I will stop now. Goodbye.",
+    "Hello! How can I help you today?",
+]
+
+
+class VoiceAssistant(TextAssistant):
+    voice_enabled = True
 
-
-class VoiceAssistant:
     def __init__(self, on_event=None):
-        self.on_event = on_event
-        self.running = False
+        super().__init__(on_event)
         self.thread = None
         self.wake_window_seconds = 15
         self.awake_until = 0.0
-        self.session_awake = False
         self._barge_in_text = None
         self._last_wake_prompt_at = 0.0
+        self.wake_spotter = WakeWordSpotter()
 
-    def _emit(self, event_type, data):
-        if self.on_event:
-            self.on_event(event_type, data)
+    def _canned_fragments(self) -> list[str]:
+        # The sentence pipeline speaks replies one sentence at a time, so cache both forms.
+        fragments = []
+        for phrase in CANNED_PHRASES:
+            sentences, _ = split_sentences(phrase + " ")
+            fragments.extend([phrase, *sentences])
+        return fragments
 
     def start(self):
         if self.running:
             return
         self.running = True
+        warmup_model()
+        warmup_tts(self._canned_fragments())
         self.thread = threading.Thread(target=self._loop, daemon=True)
         self.thread.start()
 
     def stop(self):
-        self.running = False
-        stop_speaking()
+        super().stop()
         if self.thread:
             self.thread.join(timeout=1)
 
-    def _is_stop_command(self, text: str) -> bool:
-        words = set(text.lower().split())
-        return any(word in words for word in STOP_WORDS)
-
-    def _is_exit_command(self, text: str) -> bool:
-        words = set(text.lower().split())
-        return any(word in words for word in EXIT_WORDS)
+    def _stop_output(self):
+        super()._stop_output()
+        stop_speaking()
 
     def _is_awake(self) -> bool:
         return time.time() <= self.awake_until
 
+    def _wake_gate(self, audio) -> bool:
+        # Cheap MFCC/DTW check so Whisper only runs on bursts that sound like the wake word.
+        # It is a pre-filter only: the transcript must still contain the wake phrase.
+        return self.wake_spotter.detect(audio)
+
     def _contains_wake_phrase(self, text: str) -> bool:
         normalized = self._normalize_text(text)
         return any(phrase in normalized for phrase in WAKE_PHRASES)
@@ -67,12 +86,42 @@ class VoiceAssistant:
         lowered = (text or "").lower().strip()
         return re.sub(r"[^a-z0-9]+", " ", lowered).strip()
 
+    def _respond(self, text: str):
+        """Run one turn, speaking each sentence as soon as the LLM stream completes it.
+
+        Generation runs on a worker thread so barge-in listening covers both the
+        in-flight generation and the queued speech.
+        """
+        self._emit("status", "processing")
+        pipeline = SentencePipeline()
+
+        def on_delta(token: str):
+            self._emit("ai_response_delta", token)
+            pipeline.feed(token)
+
+        def _generate():
+            try:
+                turn = self._run_turn(
+                    text,
+                    on_delta=on_delta if STREAM_RESPONSES else None,
+                    cancel_event=pipeline.cancel_event,
+                )
+                if not pipeline.fed_any:
+                    pipeline.feed(turn.response)
+            finally:
+                pipeline.close()
+
+        threading.Thread(target=_generate, daemon=True).start()
+        self._wait_with_interrupt(pipeline)
+
     def _speak_with_interrupt(self, response: str):
-        speech_thread = speak_async(response)
-        if speech_thread is None:
-            return
+        pipeline = SentencePipeline()
+        pipeline.feed(response)
+        pipeline.close()
+        self._wait_with_interrupt(pipeline)
 
-        while self.running and speech_thread.is_alive():
+    def _wait_with_interrupt(self, pipeline: SentencePipeline):
+        while self.running and pipeline.is_active():
             heard = listen_for_seconds(timeout_seconds=1.0)
             if not heard:
                 continue
@@ -80,11 +129,11 @@ class VoiceAssistant:
             self._emit("user_speech", heard)
             lowered = heard.lower().strip()
             if self._is_stop_command(lowered):
-                stop_speaking()
+                self._stop_output()
                 self._emit("ai_response", "Okay, I stopped speaking.")
                 break
             if self._is_exit_command(lowered):
-                stop_speaking()
+                self._stop_output()
                 self._emit("ai_response", "Goodbye.")
                 self.running = False
                 break
@@ -94,11 +143,11 @@ class VoiceAssistant:
             stop_speaking()
             break
 
-        speech_thread.join(timeout=1)
+        pipeline.join(timeout=1)
 
     def _loop(self):
         self._emit("status", "connected")
-        speak("Hello. Say hey jarvis when you need me.")
+        speak(GREETING)
 
         while self.running:
             if self._barge_in_text:
@@ -106,7 +155,13 @@ class VoiceAssistant:
                 self._barge_in_text = None
             else:
                 self._emit("status", "listening")
-                text = listen()
+                gate = None
+                if not self.session_awake and self.wake_spotter.enabled:
+                    gate = self._wake_gate
+                text = listen(
+                    on_partial=lambda partial: self._emit("user_speech_partial", partial),
+                    gate=gate,
+                )
                 if not text:
                     time.sleep(0.2)
                     continue
@@ -116,10 +171,10 @@ class VoiceAssistant:
             lowered = text.lower().strip()
 
             if self._is_stop_command(lowered):
-                if is_speaking():
-                    stop_speaking()
+                # Also cancels text turns still generating (their tokens are in _active_turns).
+                self._stop_output()
                 self.session_awake = False
-                self._emit("ai_response", "Okay, I stopped. Say hey jarvis when you need me again.")
+                self._emit("ai_response", STOPPED_RESPONSE)
                 continue
 
             if self._is_exit_command(lowered):
@@ -156,45 +211,8 @@ class VoiceAssistant:
             self.session_awake = True
             self.awake_until = time.time() + self.wake_window_seconds
 
-            self._emit("status", "processing")
-            turn = process_input_detailed(text)
-            self._emit("agent_route", {"route": turn.route})
-            if turn.tool_name:
-                self._emit("tool_call", {"name": turn.tool_name, "args": turn.tool_args or {}})
-            self._emit("ai_response", turn.response)
-            self._speak_with_interrupt(turn.response)
+            self._respond(text)
             time.sleep(0.2)
 
-    def handle_text_input(self, text: str):
-        if not text:
-            return
-
-        def _process():
-            lowered = text.lower().strip()
-            self._emit("user_speech", text)
-
-            if self._is_stop_command(lowered):
-                stop_speaking()
-                self.session_awake = False
-                self._emit("ai_response", "Okay, I stopped. Say hey jarvis when you need me again.")
-                return
-
-            if self._is_exit_command(lowered):
-                stop_speaking()
-                self._emit("ai_response", "Goodbye.")
-                self.running = False
-                return
-
-            self._emit("status", "processing")
-            turn = process_input_detailed(text)
-            self._emit("agent_route", {"route": turn.route})
-            if turn.tool_name:
-                self._emit("tool_call", {"name": turn.tool_name, "args": turn.tool_args or {}})
-            self._emit("ai_response", turn.response)
-            self._speak_with_interrupt(turn.response)
-            self._emit("status", "listening")
-
-        threading.Thread(target=_process, daemon=True).start()
-
 
 assistant = VoiceAssistant()
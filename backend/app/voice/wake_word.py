@@ -0,0 +1,154 @@
+import os
+import time
+import wave
+from pathlib import Path
+
+import numpy as np
+
+from app.voice.audio_capture import SAMPLE_RATE
+
+_backend_dir = Path(__file__).resolve().parents[2]
+WAKE_WORD_TEMPLATES_DIR = Path(
+    os.getenv("WAKE_WORD_TEMPLATES_DIR", str(_backend_dir / "wake_word_templates"))
+)
+# Lower thresholds reject more noise (fewer false accepts) but miss more real wake words.
+WAKE_WORD_THRESHOLD = float(os.getenv("WAKE_WORD_THRESHOLD", "9.0"))
+
+FRAME_SECONDS = 0.025
+HOP_SECONDS = 0.010
+N_FFT = 512
+N_MELS = 26
+N_MFCC = 13
+PRE_EMPHASIS = 0.97
+
+
+def _mel_filterbank(sample_rate: int = SAMPLE_RATE, n_fft: int = N_FFT, n_mels: int = N_MELS) -> np.ndarray:
+    def hz_to_mel(hz):
+        return 2595.0 * np.log10(1.0 + hz / 700.0)
+
+    def mel_to_hz(mel):
+        return 700.0 * (10.0 ** (mel / 2595.0) - 1.0)
+
+    mel_points = np.linspace(hz_to_mel(0.0), hz_to_mel(sample_rate / 2), n_mels + 2)
+    bins = np.floor((n_fft + 1) * mel_to_hz(mel_points) / sample_rate).astype(int)
+    bank = np.zeros((n_mels, n_fft // 2 + 1), dtype=np.float32)
+    for m in range(1, n_mels + 1):
+        left, center, right = bins[m - 1], bins[m], bins[m + 1]
+        if center > left:
+            bank[m - 1, left:center] = (np.arange(left, center) - left) / (center - left)
+        if right > center:
+            bank[m - 1, center:right] = (right - np.arange(center, right)) / (right - center)
+    return bank
+
+
+def _dct_matrix(n_in: int = N_MELS, n_out: int = N_MFCC) -> np.ndarray:
+    k = np.arange(n_out)[:, None]
+    n = np.arange(n_in)[None, :]
+    matrix = np.cos(np.pi * k * (2 * n + 1) / (2 * n_in)) * np.sqrt(2.0 / n_in)
+    matrix[0] /= np.sqrt(2.0)
+    return matrix.astype(np.float32)
+
+
+_MEL_BANK = _mel_filterbank()
+_DCT = _dct_matrix()
+_FRAME = int(SAMPLE_RATE * FRAME_SECONDS)
+_HOP = int(SAMPLE_RATE * HOP_SECONDS)
+_WINDOW = np.hamming(_FRAME).astype(np.float32)
+
+
+def mfcc(audio: np.ndarray) -> np.ndarray:
+    """Mean-normalized MFCCs, shape (frames, N_MFCC), computed for all frames at once."""
+    audio = np.asarray(audio, dtype=np.float32)
+    if audio.shape[0] < _FRAME:
+        audio = np.pad(audio, (0, _FRAME - audio.shape[0]))
+    emphasized = np.append(audio[0], audio[1:] - PRE_EMPHASIS * audio[:-1])
+    frames = np.lib.stride_tricks.sliding_window_view(emphasized, _FRAME)[::_HOP] * _WINDOW
+    power = np.abs(np.fft.rfft(frames, N_FFT)) ** 2 / N_FFT
+    log_mel = np.log(power @ _MEL_BANK.T + 1e-10)
+    features = log_mel @ _DCT.T
+    return features - features.mean(axis=0, keepdims=True)
+
+
+def subsequence_dtw(template: np.ndarray, query: np.ndarray) -> float:
+    """Length-normalized DTW cost of the best match of `template` anywhere inside `query`."""
+    cost = np.sqrt(((template[:, None, :] - query[None, :, :]) ** 2).sum(axis=2))
+    rows = cost.shape[0]
+    # Free start: the template may begin at any query frame.
+    previous = cost[0].copy()
+    for i in range(1, rows):
+        diagonal_or_up = np.minimum(previous, np.concatenate(([np.inf], previous[:-1])))
+        current = cost[i] + diagonal_or_up
+        # Horizontal steps: current[j] = min_k<=j(current[k] + cost[i, k+1..j]), which is a
+        # running minimum over the row's prefix sums.
+        prefix = np.cumsum(cost[i])
+        previous = prefix + np.minimum.accumulate(current - prefix)
+    # Free end: the template may finish at any query frame.
+    return float(previous.min() / rows)
+
+
+def _read_wav(path: Path) -> np.ndarray:
+    with wave.open(str(path), "rb") as wav:
+        if wav.getsampwidth() != 2 or wav.getframerate() != SAMPLE_RATE:
+            raise ValueError(f"{path} must be 16-bit PCM at {SAMPLE_RATE} Hz.")
+        channels = wav.getnchannels()
+        frames = wav.readframes(wav.getnframes())
+    pcm = np.frombuffer(frames, dtype=np.int16).reshape(-1, channels)[:, 0]
+    return pcm.astype(np.float32) / 32768.0
+
+
+class WakeWordSpotter:
+    """MFCC + DTW template matcher that gates the full Whisper model.
+
+    Templates are short 16 kHz WAV recordings of the wake phrase (e.g. "hey jarvis")
+    in `templates_dir`. With no templates the spotter is disabled and every burst
+    falls through to Whisper as before.
+    """
+
+    def __init__(self, templates_dir: Path = WAKE_WORD_TEMPLATES_DIR, threshold: float = WAKE_WORD_THRESHOLD):
+        self.templates_dir = Path(templates_dir)
+        self.threshold = threshold
+        self.templates: list[np.ndarray] = []
+        self.last_score: float | None = None
+        self.last_seconds = 0.0
+        self.reload()
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.templates)
+
+    def reload(self) -> None:
+        self.templates = []
+        if not self.templates_dir.is_dir():
+            return
+        for path in sorted(self.templates_dir.glob("*.wav")):
+            try:
+                self.templates.append(mfcc(_read_wav(path)))
+            except (OSError, EOFError, ValueError, wave.Error):
+                continue
+
+    def enroll(self, audio: np.ndarray, name: str | None = None) -> Path:
+        """Save a recording of the wake phrase as a new template."""
+        self.templates_dir.mkdir(parents=True, exist_ok=True)
+        path = self.templates_dir / f"{name or int(time.time() * 1000)}.wav"
+        pcm = (np.clip(audio, -1.0, 1.0) * 32767).astype(np.int16)
+        with wave.open(str(path), "wb") as wav:
+            wav.setnchannels(1)
+            wav.setsampwidth(2)
+            wav.setframerate(SAMPLE_RATE)
+            wav.writeframes(pcm.tobytes())
+        self.templates.append(mfcc(audio))
+        return path
+
+    def score(self, audio: np.ndarray) -> float:
+        """Best (lowest) DTW distance between the audio and any template."""
+        started = time.perf_counter()
+        features = mfcc(audio)
+        best = min((subsequence_dtw(template, features) for template in self.templates), default=np.inf)
+        self.last_seconds = time.perf_counter() - started
+        self.last_score = best
+        return best
+
+    def detect(self, audio: np.ndarray) -> bool:
+        if not self.enabled:
+            return True
+        return self.score(audio) <= self.threshold
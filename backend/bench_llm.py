@@ -0,0 +1,183 @@
+import json
+import os
+import statistics
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from app.brain.llm_engine import SYSTEM_PROMPT, OllamaClient, _build_prompt, build_prompt
+from app.brain.tokens import count_tokens
+
+TURNS = 50
+FAKE_RESPONSE = "Sure, here is a short answer."
+FAKE_TOKEN_DELAY_SECONDS = 0.01
+# Stand-in prompt processing cost; tokens shared with the previous prompt are "cached".
+FAKE_PROMPT_TOKEN_SECONDS = 0.0005
+SESSION_TURNS = 8
+
+
+class _FakeOllamaHandler(BaseHTTPRequestHandler):
+    """Minimal stand-in for the Ollama `/api/generate` endpoint."""
+
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+    last_prompt = ""
+
+    def _evaluate_prompt(self, prompt: str) -> dict:
+        """Mimic Ollama's prefix cache: only the part not shared with the last prompt is evaluated."""
+        shared = os.path.commonprefix([type(self).last_prompt, prompt])
+        type(self).last_prompt = prompt
+        evaluated = max(1, count_tokens(prompt) - count_tokens(shared))
+        time.sleep(evaluated * FAKE_PROMPT_TOKEN_SECONDS)
+        return {
+            "prompt_eval_count": evaluated,
+            "prompt_eval_duration": int(evaluated * FAKE_PROMPT_TOKEN_SECONDS * 1e9),
+        }
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length", "0"))
+        request = json.loads(self.rfile.read(length) or b"{}")
+        if request.get("stream"):
+            self._stream_response(request)
+            return
+        metrics = self._evaluate_prompt(request.get("prompt") or "")
+        body = json.dumps(
+            {
+                "model": request.get("model"),
+                "response": FAKE_RESPONSE,
+                "done": True,
+                **metrics,
+            }
+        ).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _stream_response(self, request: dict):
+        metrics = self._evaluate_prompt(request.get("prompt") or "")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/x-ndjson")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+        tokens = [f"{word} " for word in FAKE_RESPONSE.split()]
+        for index, token in enumerate(tokens):
+            time.sleep(FAKE_TOKEN_DELAY_SECONDS)
+            done = index == len(tokens) - 1
+            chunk = {"model": request.get("model"), "response": token, "done": done}
+            if done:
+                chunk.update(metrics)  # Ollama reports timings on the final chunk
+            line = json.dumps(chunk).encode("utf-8") + b"\n"
+            self.wfile.write(f"{len(line):X}\r\n".encode("ascii") + line + b"\r\n")
+            self.wfile.flush()
+        self.wfile.write(b"0\r\n\r\n")
+
+    def log_message(self, format, *args):
+        pass
+
+
+def _start_fake_server() -> tuple[ThreadingHTTPServer, str]:
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _FakeOllamaHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    host, port = server.server_address
+    return server, f"http://{host}:{port}"
+
+
+def _measure(label: str, run_turn) -> None:
+    timings = []
+    for _ in range(TURNS):
+        started = time.perf_counter()
+        response = run_turn()
+        timings.append((time.perf_counter() - started) * 1000)
+    print(
+        f"[RESULT] {label}: median={statistics.median(timings):.2f}ms "
+        f"p95={sorted(timings)[int(len(timings) * 0.95) - 1]:.2f}ms last={response!r}"
+    )
+
+
+def _measure_stream(label: str, client: OllamaClient, prompt: str) -> None:
+    first_token, last_token = [], []
+    for _ in range(max(1, TURNS // 5)):
+        started = time.perf_counter()
+        first = None
+        for _token in client.stream(prompt):
+            if first is None:
+                first = time.perf_counter() - started
+        last_token.append((time.perf_counter() - started) * 1000)
+        first_token.append((first or 0.0) * 1000)
+    print(
+        f"[RESULT] {label}: time-to-first-token={statistics.median(first_token):.2f}ms "
+        f"time-to-last-token={statistics.median(last_token):.2f}ms"
+    )
+
+
+def _memory_first(prompt: str) -> str:
+    """The old layout: per-turn memory context ahead of the conversation."""
+    head, rest = prompt.split("\nMEMORY CONTEXT (for this message):\n", 1)
+    memory, user = rest.split("\n\nUSER: ", 1)
+    return f"{SYSTEM_PROMPT}MEMORY CONTEXT:\n{memory}\n\n{head[len(SYSTEM_PROMPT):]}\nUSER: {user}"
+
+
+def _question_in_history(prompt: str) -> str:
+    """The message repeated as the last history line, as when callers passed it in the history."""
+    user = prompt.rsplit("\nUSER: ", 1)[1].rsplit("\nASSISTANT:", 1)[0]
+    head, rest = prompt.split("\nMEMORY CONTEXT (for this message):\n", 1)
+    return f"{head}USER: {user}\n\nMEMORY CONTEXT (for this message):\n{rest}"
+
+
+def _measure_session(label: str, client: OllamaClient, layout) -> None:
+    """Run a multi-turn conversation and sum what the server spent evaluating prompts."""
+    history: list[dict] = []
+    evaluated, total_tokens, eval_ms = 0, 0, 0.0
+    for turn in range(SESSION_TURNS):
+        question = f"Question {turn}: what should I do about project item {turn}?"
+        memory = f"Relevant notes:\n- ({turn}) note about project item {turn} and its deadline"
+        prompt = layout(build_prompt(question, history, memory).text)
+        answer, metrics = client.generate_with_metrics(prompt)
+        evaluated += metrics.get("prompt_eval_count", 0)
+        eval_ms += metrics.get("prompt_eval_ms", 0.0)
+        total_tokens += count_tokens(prompt)
+        history += [{"role": "user", "content": question}, {"role": "assistant", "content": answer}]
+    print(
+        f"[RESULT] {label}: {SESSION_TURNS} turns, prompt tokens evaluated {evaluated} of ~{total_tokens}, "
+        f"prompt eval {eval_ms:.0f}ms"
+    )
+
+
+def run_benchmark(host: str | None = None) -> None:
+    server = None
+    if host is None:
+        server, host = _start_fake_server()
+        print(f"[INFO] Using stand-in Ollama server at {host}")
+    else:
+        print(f"[INFO] Using Ollama server at {host}")
+
+    prompt = _build_prompt("What is the capital of France?")
+    pooled = OllamaClient(host=host)
+
+    def pooled_turn():
+        return pooled.generate(prompt)
+
+    def fresh_turn():
+        client = OllamaClient(host=host)
+        try:
+            return client.generate(prompt)
+        finally:
+            client.close()
+
+    _measure("pooled client", pooled_turn)
+    _measure("fresh connection per turn", fresh_turn)
+    _measure_stream("streaming", pooled, prompt)
+    _measure_session("session, memory-first prompt (old layout)", pooled, _memory_first)
+    _measure_session("session, stable prefix, message repeated in history", pooled, _question_in_history)
+    _measure_session("session, stable prefix + append-only conversation", pooled, lambda text: text)
+
+    pooled.close()
+    if server is not None:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    run_benchmark(sys.argv[1] if len(sys.argv) > 1 else None)
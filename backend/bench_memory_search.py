@@ -0,0 +1,78 @@
+import itertools
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+# Keep every generated note; retention would otherwise cap the table at 5k rows.
+os.environ.setdefault("ASSISTANT_MAX_NOTES", "0")
+os.environ.setdefault("ASSISTANT_MEMORY_DB", str(Path(tempfile.gettempdir()) / "bench_memory_init.db"))
+
+from app.brain import memory
+from app.brain.db import ConnectionManager
+
+SIZES = [5_000, 50_000, 500_000]
+# Zipf-distributed synthetic vocabulary, so a few words are common and most are rare.
+_vocab_rng = random.Random(0)
+VOCABULARY = [
+    "".join(_vocab_rng.choices("abcdefghijklmnopqrstuvwxyz", k=_vocab_rng.randint(3, 9)))
+    for _ in range(20_000)
+]
+_CUM_WEIGHTS = list(itertools.accumulate(1 / (rank + 1) for rank in range(len(VOCABULARY))))
+# (common, rare) word pairs by frequency rank.
+QUERIES = [
+    f"{VOCABULARY[a]} {VOCABULARY[b]}" for a, b in [(5, 50), (5, 500), (50, 500), (500, 3000), (3000, 15000)]
+]
+REPEATS = 20
+
+
+def _populate(path: Path, count: int) -> None:
+    memory._db.close()
+    memory._db = ConnectionManager(path)
+    memory.init_memory_db()
+    rng = random.Random(count)
+    start = datetime.utcnow() - timedelta(days=365)
+    batch = 10_000
+    for offset in range(0, count, batch):
+        rows = [
+            (
+                " ".join(rng.choices(VOCABULARY, cum_weights=_CUM_WEIGHTS, k=rng.randint(5, 20))),
+                (start + timedelta(minutes=offset + i)).isoformat(timespec="seconds"),
+            )
+            for i in range(min(batch, count - offset))
+        ]
+        with memory._db.writer() as conn:
+            conn.executemany("INSERT INTO notes(content, created_at) VALUES (?, ?)", rows)
+
+
+def _time_ms(search, query: str) -> float:
+    timings = []
+    for _ in range(REPEATS):
+        started = time.perf_counter()
+        search(query, 5)
+        timings.append((time.perf_counter() - started) * 1000)
+    return statistics.median(timings)
+
+
+def run_benchmark(sizes: list[int]) -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        for size in sizes:
+            path = Path(tmp) / f"notes_{size}.db"
+            started = time.perf_counter()
+            _populate(path, size)
+            print(f"[INFO] {size} notes inserted in {time.perf_counter() - started:.1f}s")
+            fts = [_time_ms(memory.search_notes, query) for query in QUERIES]
+            like = [_time_ms(memory._search_notes_like, query) for query in QUERIES]
+            print(
+                f"[RESULT] {size:>7} notes: FTS5 median={statistics.median(fts):.2f}ms "
+                f"max={max(fts):.2f}ms | LIKE median={statistics.median(like):.2f}ms max={max(like):.2f}ms"
+            )
+        memory._db.close()
+
+
+if __name__ == "__main__":
+    run_benchmark([int(arg) for arg in sys.argv[1:]] or SIZES)
@@ -0,0 +1,53 @@
+import statistics
+import sys
+from pathlib import Path
+
+import numpy as np
+
+from app.voice.audio_capture import SAMPLE_RATE
+from app.voice.wake_word import WAKE_WORD_TEMPLATES_DIR, WakeWordSpotter, _read_wav
+
+
+def _score_clips(spotter: WakeWordSpotter, folder: Path) -> tuple[list[float], list[float]]:
+    scores, rtfs = [], []
+    for path in sorted(folder.glob("*.wav")):
+        audio = _read_wav(path)
+        scores.append(spotter.score(audio))
+        rtfs.append(spotter.last_seconds / max(audio.shape[0] / SAMPLE_RATE, 1e-6))
+    return scores, rtfs
+
+
+def run_benchmark(clips_dir: str, templates_dir: str | None = None) -> None:
+    """Sweep thresholds over recorded clips in `<clips_dir>/positive` and `<clips_dir>/negative`."""
+    spotter = WakeWordSpotter(Path(templates_dir) if templates_dir else WAKE_WORD_TEMPLATES_DIR)
+    if not spotter.enabled:
+        print(f"[ERROR] No templates found in {spotter.templates_dir}")
+        return
+
+    root = Path(clips_dir)
+    positives, positive_rtf = _score_clips(spotter, root / "positive")
+    negatives, negative_rtf = _score_clips(spotter, root / "negative")
+    if not positives or not negatives:
+        print("[ERROR] Need WAV clips in both positive/ and negative/.")
+        return
+
+    print(
+        f"[INFO] {len(spotter.templates)} templates, {len(positives)} positive and "
+        f"{len(negatives)} negative clips"
+    )
+    print(f"[INFO] Spotter real-time factor: median={statistics.median(positive_rtf + negative_rtf):.4f}")
+    print("threshold  false_accept  false_reject")
+    all_scores = np.array(positives + negatives)
+    finite = all_scores[np.isfinite(all_scores)]
+    for threshold in np.linspace(finite.min(), finite.max(), 12):
+        false_accept = float(np.mean(np.array(negatives) <= threshold))
+        false_reject = float(np.mean(np.array(positives) > threshold))
+        print(f"{threshold:9.3f}  {false_accept:12.2%}  {false_reject:12.2%}")
+    print(f"[INFO] Current WAKE_WORD_THRESHOLD={spotter.threshold}")
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2:
+        print("Usage: python bench_wake_word.py <clips_dir> [templates_dir]")
+        sys.exit(1)
+    run_benchmark(sys.argv[1], sys.argv[2] if len(sys.argv) > 2 else None)
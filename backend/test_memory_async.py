@@ -0,0 +1,82 @@
+import asyncio
+import os
+import statistics
+import tempfile
+import time
+from pathlib import Path
+
+# Run against a throwaway DB; never touch the real assistant memory.
+_tmp = tempfile.TemporaryDirectory()
+os.environ["ASSISTANT_MEMORY_DB"] = str(Path(_tmp.name) / "async_memory_test.db")
+os.environ.setdefault("ASSISTANT_SEMANTIC_MEMORY", "0")
+
+from app.brain import async_memory, memory
+
+TICK_SECONDS = 0.005
+MAX_LAG_MS = 50.0
+WRITES = 2000
+IMPORT_NOTES = 50_000
+
+
+async def _heartbeat(lags: list[float], stop: asyncio.Event) -> None:
+    """Record how late each short sleep wakes up; a blocked loop shows up as lag."""
+    while not stop.is_set():
+        started = time.perf_counter()
+        await asyncio.sleep(TICK_SECONDS)
+        lags.append((time.perf_counter() - started - TICK_SECONDS) * 1000)
+
+
+async def _measure(label: str, workload) -> float:
+    lags: list[float] = []
+    stop = asyncio.Event()
+    beat = asyncio.create_task(_heartbeat(lags, stop))
+    await asyncio.sleep(0.05)
+    started = time.perf_counter()
+    await workload()
+    elapsed = time.perf_counter() - started
+    stop.set()
+    await beat
+    worst = max(lags) if lags else 0.0
+    print(
+        f"[RESULT] {label}: {elapsed:.2f}s, loop lag median={statistics.median(lags):.2f}ms "
+        f"max={worst:.2f}ms over {len(lags)} ticks"
+    )
+    return worst
+
+
+async def _async_writes():
+    for start in range(0, WRITES, 100):
+        await asyncio.gather(
+            *(async_memory.add_note(f"async note {i}") for i in range(start, start + 100)),
+            async_memory.add_task(f"async task {start}"),
+            async_memory.search_notes("async note"),
+            async_memory.get_relevant_memory("what are my tasks"),
+        )
+    await async_memory.import_records(
+        {"type": "note", "content": f"imported note {i}"} for i in range(IMPORT_NOTES)
+    )
+
+
+async def _blocking_writes():
+    # What a coroutine calling memory directly does to the loop, for comparison.
+    for i in range(WRITES // 4):
+        memory.add_note(f"blocking note {i}")
+    memory.import_records({"type": "note", "content": f"blocking import {i}"} for i in range(IMPORT_NOTES // 4))
+
+
+async def test_memory_async():
+    print(f"[INFO] Memory DB: {memory.DB_PATH}")
+    worst = await _measure("async facade", _async_writes)
+    await _measure("direct blocking calls", _blocking_writes)
+    stats = await async_memory.get_memory_stats()
+    print(f"[INFO] Rows: {stats['table_rows']}")
+    if worst <= MAX_LAG_MS:
+        print(f"[OK] Event loop stayed responsive (max lag {worst:.1f}ms <= {MAX_LAG_MS:.0f}ms).")
+    else:
+        print(f"[ERROR] Event loop stalled for {worst:.1f}ms under memory writes.")
+
+
+if __name__ == "__main__":
+    asyncio.run(test_memory_async())
+    async_memory.shutdown()
+    memory._db.close()
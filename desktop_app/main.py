@@ -89,6 +89,7 @@ def main(page: ft.Page):
         icon_color = ACCENT_ALT if is_user else ACCENT
         align = ft.MainAxisAlignment.END if is_user else ft.MainAxisAlignment.START
         label = "YOU" if is_user else "JARVIS"
+        message_text = ft.Text(text, size=14, color=TEXT, selectable=True)
 
         bubble = ft.Container(
             content=ft.Column(
@@ -100,7 +101,7 @@ def main(page: ft.Page):
                         ],
                         spacing=6,
                     ),
-                    ft.Text(text, size=14, color=TEXT, selectable=True),
+                    message_text,
                 ],
                 spacing=6,
                 tight=True,
@@ -114,6 +115,7 @@ def main(page: ft.Page):
 
         chat_list.controls.append(ft.Row(controls=[bubble], alignment=align))
         page.update()
+        return message_text
 
     async def ws_loop():
         global global_ws
@@ -123,6 +125,7 @@ def main(page: ft.Page):
                     global_ws = websocket
                     set_status("Connected", ACCENT_ALT)
                     set_error("")
+                    streaming_text = None
                     while True:
                         raw = await websocket.recv()
                         event = json.loads(raw)
@@ -131,8 +134,22 @@ def main(page: ft.Page):
 
                         if event_type == "user_speech":
                             add_message(str(data), is_user=True)
+                        elif event_type == "user_speech_partial":
+                            voice_cue_hint.value = str(data)
+                            page.update()
+                        elif event_type == "ai_response_delta":
+                            if streaming_text is None:
+                                streaming_text = add_message(str(data), is_user=False)
+                            else:
+                                streaming_text.value += str(data)
+                                page.update()
                         elif event_type == "ai_response":
-                            add_message(str(data), is_user=False)
+                            if streaming_text is not None:
+                                streaming_text.value = str(data)
+                                streaming_text = None
+                                page.update()
+                            else:
+                                add_message(str(data), is_user=False)
                         elif event_type == "status":
                             if data == "listening":
                                 set_status("Listening", ACCENT_ALT)